@@ -1,14 +1,132 @@
-from datetime import datetime
-from typing import List, Optional, Tuple
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import func, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from models import LogModel
 from schemas import LogDTO, LogEventType
 
+logger = logging.getLogger(__name__)
+
+# Log entries queued by enqueue_log and written in batches by run_log_writer
+_LOG_QUEUE_MAXSIZE = 10_000
+_LOG_BATCH_SIZE = 500
+_LOG_FLUSH_INTERVAL_SECONDS = 0.1
+_log_queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(
+    maxsize=_LOG_QUEUE_MAXSIZE
+)
+# Queued by stop_log_writer to make run_log_writer return
+_STOP_WRITER: Dict[str, Any] = {}
+
+
+def enqueue_log(
+    event_type: LogEventType,
+    user_id: Optional[UUID],
+    message: str,
+    ip_address: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> None:
+    """
+    Queue a log entry for the background writer without touching the
+    caller's session. The entry is dropped if the queue is full.
+
+    Args:
+        event_type: Type of event from LogEventType enum
+        user_id: Optional UUID of the user
+        message: Log message
+        ip_address: Optional IP address
+        timestamp: Optional event time already known to the caller (e.g. a
+            row's database timestamp); defaults to the current time
+    """
+    try:
+        _log_queue.put_nowait(
+            {
+                "event_type": event_type,
+                "user_id": user_id,
+                "ip_address": ip_address,
+                "message": message,
+                "timestamp": timestamp or datetime.now(timezone.utc),
+            }
+        )
+    except asyncio.QueueFull:
+        logger.warning(f"Log queue full, dropping log entry: {message}")
+
+
+async def _write_logs(
+    session_maker: Callable[[], AsyncSession], entries: List[Dict[str, Any]]
+) -> None:
+    """Insert a batch of queued log entries with a single executemany."""
+    try:
+        async with session_maker() as session:
+            await session.execute(insert(LogModel), entries)
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Failed to write {len(entries)} log entries: {str(e)}")
+
+
+async def run_log_writer(session_maker: Callable[[], AsyncSession]) -> None:
+    """
+    Drain the log queue until stop_log_writer is called, writing up to
+    _LOG_BATCH_SIZE entries at a time or whatever has arrived within
+    _LOG_FLUSH_INTERVAL_SECONDS.
+
+    Args:
+        session_maker: Factory for the writer's own database sessions
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        entry = await _log_queue.get()
+        if entry is _STOP_WRITER:
+            return
+        batch = [entry]
+        deadline = loop.time() + _LOG_FLUSH_INTERVAL_SECONDS
+        while len(batch) < _LOG_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(_log_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if entry is _STOP_WRITER:
+                # Write what was already taken off the queue, then stop
+                await _write_logs(session_maker, batch)
+                return
+            batch.append(entry)
+        await _write_logs(session_maker, batch)
+
+
+async def stop_log_writer(writer: "asyncio.Task[None]") -> None:
+    """
+    Stop run_log_writer after it has written every entry queued so far,
+    including a partially collected batch (used on shutdown instead of
+    cancelling the task, which would drop that batch).
+
+    Args:
+        writer: Task running run_log_writer
+    """
+    await _log_queue.put(_STOP_WRITER)
+    await writer
+
+
+async def flush_log_queue(session_maker: Callable[[], AsyncSession]) -> None:
+    """
+    Write every entry still waiting in the log queue (used on shutdown).
+
+    Args:
+        session_maker: Factory for the writer's own database sessions
+    """
+    while not _log_queue.empty():
+        batch = []
+        while not _log_queue.empty() and len(batch) < _LOG_BATCH_SIZE:
+            batch.append(_log_queue.get_nowait())
+        await _write_logs(session_maker, batch)
+
 
 class LogService:
     def __init__(self, db_session: AsyncSession):
@@ -38,7 +156,6 @@ class LogService:
             user_id=user_id,
             ip_address=ip_address,
             message=message,
-            timestamp=datetime.utcnow(),
         )
         self.db_session.add(log)
 
@@ -66,9 +183,6 @@ class LogService:
         if start_date and end_date and end_date < start_date:
             raise ValueError("End date must be after start date")
 
-        # Build base queries
-        count_query = select(func.count()).select_from(LogModel)
-        data_query = select(LogModel)
         filters = []
         if event_type:
             filters.append(LogModel.event_type == event_type)
@@ -80,35 +194,49 @@ class LogService:
             filters.append(LogModel.timestamp >= start_date)
         if end_date:
             filters.append(LogModel.timestamp <= end_date)
-        if filters:
-            for cond in filters:
-                count_query = count_query.where(cond)
-                data_query = data_query.where(cond)
 
-        # Get total count
-        total = (await self.db_session.execute(count_query)).scalar() or 0
-        pages = (total + limit - 1) // limit if total > 0 else 1
-
-        # Apply ordering and pagination
+        # Logs are only read here, so select plain columns instead of ORM
+        # entities, together with the total count of matching rows
         offset = (page - 1) * limit
         data_query = (
-            data_query.order_by(LogModel.timestamp.desc())
+            select(
+                LogModel.id,
+                LogModel.event_type,
+                LogModel.user_id,
+                LogModel.ip_address,
+                LogModel.message,
+                LogModel.timestamp,
+                func.count().over().label("total"),
+            )
+            .where(*filters)
+            .order_by(LogModel.timestamp.desc())
             .offset(offset)
             .limit(limit)
         )
-        result = await self.db_session.execute(data_query)
-        logs = result.scalars().all()
+        rows = (await self.db_session.execute(data_query)).all()
+
+        if rows:
+            total = rows[0].total
+        elif offset > 0:
+            # A page past the end has no rows to carry the count
+            count_query = (
+                select(func.count()).select_from(LogModel).where(*filters)
+            )
+            total = (await self.db_session.execute(count_query)).scalar() or 0
+        else:
+            total = 0
+        pages = (total + limit - 1) // limit if total > 0 else 1
 
         # Map to DTO
         items = [
             LogDTO(
-                id=ln.id,
-                event_type=ln.event_type,
-                user_id=ln.user_id,
-                ip_address=ln.ip_address,
-                message=ln.message,
-                timestamp=ln.timestamp,
+                id=row.id,
+                event_type=row.event_type,
+                user_id=row.user_id,
+                ip_address=row.ip_address,
+                message=row.message,
+                timestamp=row.timestamp,
             )
-            for ln in logs
+            for row in rows
         ]
         return items, total, pages
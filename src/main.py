@@ -11,16 +11,53 @@ sys.path.insert(
 # Ensure src directory is in Python path for top-level imports
 sys.path.insert(0, os.path.dirname(__file__))
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from fastapi.utils import is_body_allowed_for_status_code
 from fastapi_csrf_protect import CsrfProtect
 from fastapi_csrf_protect.exceptions import CsrfProtectError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from config import ensure_media_dirs
+from dependencies import (get_async_session_maker, run_reservation_sweeper,
+                          warmup_pool)
 from security.csrf import CsrfSettings, handle_csrf_error
+from services.log_service import (flush_log_queue, run_log_writer,
+                                  stop_log_writer)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_media_dirs()
+    await warmup_pool()
+    session_maker = get_async_session_maker()
+    # Background writer for log entries queued with enqueue_log
+    log_writer = asyncio.create_task(run_log_writer(session_maker))
+    # Cancels unpaid orders whose stock reservation has expired
+    reservation_sweeper = asyncio.create_task(run_reservation_sweeper())
+    yield
+    reservation_sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await reservation_sweeper
+    # Let the writer finish its current batch; entries queued after it
+    # stopped are written by flush_log_queue
+    await stop_log_writer(log_writer)
+    await flush_log_queue(session_maker)
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -131,6 +168,9 @@ Common error codes include:
     version="0.1.0",
     docs_url=None,  # Disable default docs
     redoc_url=None,  # Disable default redoc
+    lifespan=lifespan,
+    # orjson encodes responses several times faster than the stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -159,11 +199,48 @@ async def csrf_protect_exception_handler(
     return JSONResponse(status_code=403, content=handle_csrf_error(exc))
 
 
+# HTTP error handler; same body as FastAPI's default, encoded with orjson
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(
+    request: Request, exc: StarletteHTTPException
+):
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=headers
+    )
+
+
+# Body fields whose validation errors keep a dedicated error code
+FIELD_ERROR_CODES = {
+    "price": "INVALID_PRICE",
+    "quantity": "INVALID_QUANTITY",
+}
+
+
 # Validation error handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
 ):
+    for error in exc.errors():
+        loc = error.get("loc", ())
+        if (
+            len(loc) == 2
+            and loc[0] == "body"
+            and loc[1] in FIELD_ERROR_CODES
+            and error.get("type") != "missing"
+        ):
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "detail": {
+                        "error_code": FIELD_ERROR_CODES[loc[1]],
+                        "message": f"Invalid {loc[1]}: {error['msg']}",
+                    }
+                },
+            )
     return JSONResponse(
         status_code=400,
         content={
@@ -4,7 +4,7 @@ from sqlalchemy import Column, DateTime
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy import ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
 from schemas import (LogEventType, OfferStatus, OrderStatus, TransactionStatus,
@@ -32,6 +32,39 @@ class UserModel(Base):
         DateTime(timezone=True), onupdate=func.now(), nullable=True
     )
 
+    __table_args__ = (
+        # Indeks dla filtrowania listy użytkowników po statusie i roli,
+        # posortowanej od najnowszych
+        Index(
+            "ix_users_status_role_created",
+            status,
+            role,
+            created_at.desc(),
+        ),
+        # Indeksy trigramowe (pg_trgm) dla wyszukiwania ILIKE '%term%'
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+    )
+
+    # updated_at ustawiane przez bazę pobieramy przez RETURNING przy flush
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class LogModel(Base):
     __tablename__ = "logs"
@@ -87,10 +120,28 @@ class OfferModel(Base):
         DateTime(timezone=True), onupdate=func.now(), nullable=True
     )
 
+    # Relacje ładowane tylko jawnie (joinedload/selectinload); leniwy odczyt
+    # rzuca wyjątek zamiast wykonywać ukryte zapytanie dla każdego wiersza
+    seller = relationship("UserModel", lazy="raise")
+    category = relationship("CategoryModel", lazy="raise")
+
     # Indeksy złożone dla szybszego wyszukiwania
     __table_args__ = (
         Index("ix_offers_seller_status", "seller_id", "status"),
         Index("ix_offers_status_quantity", "status", "quantity"),
+        # Indeksy trigramowe (pg_trgm) dla wyszukiwania ILIKE '%term%'
+        Index(
+            "ix_offers_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_offers_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
     )
 
 
@@ -114,12 +165,23 @@ class OrderModel(Base):
         DateTime(timezone=True), onupdate=func.now(), nullable=True
     )
 
+    # Licznik wersji do optymistycznego blokowania zmian statusu
+    version_id = Column(Integer, nullable=False, default=0)
+
+    items = relationship(
+        "OrderItemModel", order_by="OrderItemModel.id", lazy="raise"
+    )
+
     # Indeks dla szybszego filtrowania po statusie i dacie
     __table_args__ = (
         Index("ix_orders_buyer_id_status", "buyer_id", "status"),
         Index("ix_orders_created_at", "created_at"),
     )
 
+    # updated_at ustawiane przez bazę pobieramy przez RETURNING przy flush;
+    # UPDATE z nieaktualną wersją kończy się StaleDataError
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version_id}
+
 
 class OrderItemModel(Base):
     __tablename__ = "order_items"
@@ -3,9 +3,8 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi_csrf_protect import CsrfProtect
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from dependencies import get_db_session, get_logger, require_authenticated
+from dependencies import get_logger, get_user_service, require_authenticated
 from schemas import (ChangePasswordRequest, ChangePasswordResponse,
                      UpdateUserRequest, UserDTO)
 from services.user_service import UserService
@@ -56,7 +55,7 @@ router = APIRouter(tags=["account"])
 async def get_current_user(
     request: Request,
     session_data: dict = Depends(require_authenticated),
-    db_session: AsyncSession = Depends(get_db_session),
+    user_service: UserService = Depends(get_user_service),
     logger: Logger = Depends(get_logger),
 ):
     """
@@ -88,7 +87,6 @@ async def get_current_user(
         )
 
         # Call service to get user data - convert to UUID only if it's a string
-        user_service = UserService(db_session, logger)
         if isinstance(user_id, str):
             try:
                 user_data = await user_service.get_current_user(UUID(user_id))
@@ -186,7 +184,7 @@ async def update_current_user_profile(
     update_data: UpdateUserRequest,
     request: Request,
     session_data: dict = Depends(require_authenticated),
-    db_session: AsyncSession = Depends(get_db_session),
+    user_service: UserService = Depends(get_user_service),
     logger: Logger = Depends(get_logger),
     csrf_protect: CsrfProtect = Depends(),
 ):
@@ -243,7 +241,6 @@ async def update_current_user_profile(
             )
 
         # Call service to update user profile - convert to UUID only if it's a string
-        user_service = UserService(db_session, logger)
         if isinstance(user_id, str):
             try:
                 updated_user = await user_service.update_user_profile(
@@ -358,7 +355,7 @@ async def change_current_user_password(
     password_data: ChangePasswordRequest,
     request: Request,
     session_data: dict = Depends(require_authenticated),
-    db_session: AsyncSession = Depends(get_db_session),
+    user_service: UserService = Depends(get_user_service),
     logger: Logger = Depends(get_logger),
     csrf_protect: CsrfProtect = Depends(),
 ):
@@ -415,7 +412,6 @@ async def change_current_user_password(
         client_ip = request.client.host
 
         # Call service to change password - convert to UUID only if it's a string
-        user_service = UserService(db_session, logger)
         if isinstance(user_id, str):
             try:
                 success = await user_service.change_password(
@@ -6,6 +6,7 @@ from fastapi_csrf_protect import CsrfProtect
 
 from dependencies import (get_admin_user, get_log_service, get_logger, get_offer_service,
                           get_order_service, get_user_service)
+from exceptions.base import ConflictError
 from schemas import (AdminLogListQueryParams, AdminOfferListQueryParams,
                      AdminOrderListQueryParams, ErrorResponse, LogEventType,
                      LogListResponse, OfferDetailDTO, OfferListResponse,
@@ -964,6 +965,17 @@ async def cancel_order(
             status_code=status_code,
             detail={"error_code": error_code, "message": error_message},
         )
+    except ConflictError as e:
+        # Order was modified concurrently by another request
+        await log_service.create_log(
+            event_type=LogEventType.ORDER_CANCEL_FAIL,
+            user_id=current_user.id,
+            message=f"Failed to cancel order {order_id}: {str(e)}",
+        )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"error_code": "CANNOT_CANCEL", "message": str(e)},
+        )
     except Exception as e:
         # Log unexpected error
         await log_service.create_log(
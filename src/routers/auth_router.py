@@ -8,7 +8,7 @@ from fastapi_csrf_protect import CsrfProtect
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from dependencies import (get_auth_service, get_db_session, get_logger,
+from dependencies import (get_auth_service, get_db_session_ro, get_logger,
                           get_session_service)
 from models import UserModel
 from schemas import (LoginUserRequest, LoginUserResponse, LogoutUserResponse,
@@ -302,7 +302,7 @@ async def logout_user(
 async def auth_status(
     request: Request,
     session_service: SessionService = Depends(get_session_service),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session_ro),
     logger: Logger = Depends(get_logger),
 ):
     """
@@ -328,9 +328,17 @@ async def auth_status(
 
             # Get extended user info from database
             user_result = await db.execute(
-                select(UserModel).where(UserModel.id == user_id)
+                select(
+                    UserModel.id,
+                    UserModel.email,
+                    UserModel.role,
+                    UserModel.status,
+                    UserModel.first_name,
+                    UserModel.last_name,
+                    UserModel.created_at,
+                ).where(UserModel.id == user_id)
             )
-            user = user_result.scalar_one_or_none()
+            user = user_result.one_or_none()
 
             if not user:
                 logger.warning(
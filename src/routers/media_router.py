@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from dependencies import (get_current_user_optional, get_db_session,
+from dependencies import (get_current_user_optional, get_db_session_ro,
                           get_logger, get_media_service)
 from exceptions.offer_exceptions import OfferNotFoundException
 from models import OfferModel
@@ -20,7 +20,7 @@ async def get_offer_image(
     request: Request,
     offer_id: UUID = Path(..., description="UUID of the offer"),
     filename: str = Path(..., description="Filename of the image"),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session_ro),
     logger: Logger = Depends(get_logger),
     media_service: MediaService = Depends(get_media_service),
     current_user: Optional[Dict[str, any]] = Depends(
@@ -1,7 +1,6 @@
 import logging
-from decimal import Decimal
 from logging import Logger
-from typing import Optional
+from typing import Annotated, Optional
 from uuid import UUID
 
 from fastapi import (APIRouter, BackgroundTasks, Depends, File, Form,
@@ -11,10 +10,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
-from dependencies import get_db_session
+from dependencies import get_db_session, get_db_session_ro
 from dependencies import get_logger as get_logger_dependency
 from dependencies import get_media_service, get_offer_service, require_seller
-from schemas import OfferDetailDTO, OfferListQueryParams, OfferListResponse, OfferSummaryDTO
+from schemas import (OfferDetailDTO, OfferListQueryParams, OfferListResponse,
+                     OfferPrice, OfferQuantity, OfferSummaryDTO, OfferTitle)
 from services.media_service import MediaService
 from services.offer_service import OfferService
 
@@ -53,7 +53,7 @@ router = APIRouter(tags=["offers"])
 async def search_offers(
     request: Request,
     query_params: OfferListQueryParams,
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_db_session_ro),
     logger: Logger = Depends(get_logger_dependency),
 ):
     """
@@ -225,10 +225,10 @@ async def search_offers(
 async def create_offer(
     background_tasks: BackgroundTasks,
     request: Request,
-    title: str = Form(...),
-    price: Decimal = Form(...),
+    title: Annotated[OfferTitle, Form()],
+    price: Annotated[OfferPrice, Form()],
     category_id: int = Form(...),
-    quantity: int = Form(1),
+    quantity: Annotated[OfferQuantity, Form()] = 1,
     description: Optional[str] = Form(None),
     image: Optional[UploadFile] = File(None),
     session_data: dict = Depends(require_seller),
@@ -269,7 +269,7 @@ async def create_offer(
 
     ## Error Codes
     - INVALID_INPUT: Missing or invalid fields in request
-    - INVALID_PRICE: Price must be greater than 0
+    - INVALID_PRICE: Price must be greater than 0 (at most 10 digits, 2 decimal places)
     - INVALID_QUANTITY: Quantity cannot be negative
     - INVALID_FILE_TYPE: Unsupported image format
     - FILE_TOO_LARGE: Image exceeds size limit
@@ -5,7 +5,8 @@ from enum import Enum
 from typing import Any, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from pydantic import (BaseModel, ConfigDict, EmailStr, Field, condecimal,
+                      conint, constr, field_validator)
 
 
 # Enum Types from DB
@@ -306,19 +307,21 @@ class OfferDetailDTO(OfferSummaryDTO):
         }
 
 
+# Constrained offer fields, validated by pydantic-core (mirror Numeric(10, 2)
+# and String(255) in OfferModel). Declared with the con* helpers rather than
+# Field() so routes can reuse them as Annotated[..., Form()] parameters.
+OfferPrice = condecimal(gt=0, max_digits=10, decimal_places=2)
+OfferQuantity = conint(ge=0)
+OfferTitle = constr(min_length=1, max_length=255)
+
+
 class CreateOfferRequest(BaseModel):
-    title: str
+    title: OfferTitle
     description: Optional[str] = None
-    price: Decimal = Field(..., gt=0)
-    quantity: int = Field(1, ge=0)
+    price: OfferPrice
+    quantity: OfferQuantity = 1
     category_id: int
 
-    @field_validator("price")
-    def validate_price(cls, v):
-        if v <= 0:
-            raise ValueError("Price must be greater than 0")
-        return v
-
 
 class UpdateOfferRequest(CreateOfferRequest):
     pass
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from fastapi import Request
+
+from services.session_service import SessionData, SessionService
+
+# Key of the resolved session in the request state (None if not logged in)
+SESSION_STATE_KEY = "session_data"
+
+
+async def get_request_session(
+    request: Request, session_service: SessionService
+) -> Optional[SessionData]:
+    """
+    Return the session of the current request, resolving the session cookie
+    only the first time an auth dependency asks for it.
+
+    The result (None if nobody is logged in) is kept in request.state, so
+    routes without auth dependencies never pay for a session lookup.
+
+    Args:
+        request: FastAPI request object
+        session_service: Session service used to resolve the cookie
+
+    Returns:
+        SessionData of the logged-in user, or None
+    """
+    state = request.scope.setdefault("state", {})
+    if SESSION_STATE_KEY not in state:
+        state[SESSION_STATE_KEY] = await session_service.peek_session(request)
+    return state[SESSION_STATE_KEY]
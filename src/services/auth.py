@@ -1,3 +1,5 @@
+import hashlib
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, Request, status
@@ -5,12 +7,63 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import UserModel
+from utils.cache_utils import TTLCache
 
 # Removed dependency import to avoid circular import
 # from dependencies import get_db_session
 
 security = HTTPBearer()
 
+# Placeholder user ID until token verification is implemented
+_PLACEHOLDER_USER_ID: UUID = UUID("12345678-1234-5678-1234-567812345678")
+
+_NOT_AUTHENTICATED_DETAIL = {
+    "error_code": "NOT_AUTHENTICATED",
+    "message": "User is not logged in.",
+}
+_USER_NOT_FOUND_DETAIL = {
+    "error_code": "USER_NOT_FOUND",
+    "message": "User not found.",
+}
+
+# Resolved user ids keyed by SHA-256 of the token (raw tokens are never
+# stored). Only the id is cached: ORM instances belong to the session that
+# loaded them and must not be shared across requests.
+_TOKEN_CACHE_TTL_SECONDS = 30
+_token_cache: TTLCache[UUID] = TTLCache(
+    maxsize=10_000, ttl=_TOKEN_CACHE_TTL_SECONDS
+)
+
+
+async def _resolve_user(token: str, db: AsyncSession) -> Optional[UserModel]:
+    """
+    Resolve the user for a token, consulting the token cache for its user id.
+
+    Note: this module is an unused placeholder (routes authenticate through
+    dependencies.require_authenticated) and maps every token to the fixed
+    _PLACEHOLDER_USER_ID.
+
+    Args:
+        token: Value of the Authorization header
+        db: Database session
+
+    Returns:
+        User object, or None if the user could not be found
+    """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    user_id = _token_cache.get(cache_key)
+    if user_id is None:
+        # This is a placeholder - actual implementation would verify JWT
+        # token or session from the request, extract user_id and cap the
+        # cache TTL at the token's remaining lifetime
+        user_id = _PLACEHOLDER_USER_ID
+
+    user = await db.get(UserModel, user_id)
+
+    if user is not None:
+        _token_cache.set(cache_key, user_id)
+    return user
+
 
 async def get_current_user(request: Request, db: AsyncSession):
     """
@@ -26,32 +79,19 @@ async def get_current_user(request: Request, db: AsyncSession):
     Raises:
         HTTPException: If user is not authenticated or not found
     """
-    # This is a placeholder - actual implementation would verify JWT token
-    # or session from the request and retrieve the user from DB
-
     token = request.headers.get("Authorization", "")
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error_code": "NOT_AUTHENTICATED",
-                "message": "User is not logged in.",
-            },
+            detail=_NOT_AUTHENTICATED_DETAIL,
         )
 
-    # In the real implementation, we would verify the token and extract user_id
-    user_id = UUID("12345678-1234-5678-1234-567812345678")  # Placeholder
-
-    # Get the user from database
-    user = await db.get(UserModel, user_id)
+    user = await _resolve_user(token, db)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error_code": "USER_NOT_FOUND",
-                "message": "User not found.",
-            },
+            detail=_USER_NOT_FOUND_DETAIL,
         )
 
     return user
@@ -69,7 +109,7 @@ async def get_current_user_optional(request: Request, db: AsyncSession):
     Returns:
         User object if authenticated, None otherwise
     """
-    try:
-        return await get_current_user(request, db)
-    except HTTPException:
+    token = request.headers.get("Authorization", "")
+    if not token:
         return None
+    return await _resolve_user(token, db)
@@ -9,8 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from models import LogModel, UserModel
 from schemas import (LogEventType, LoginUserRequest, RegisterUserRequest,
                      UserStatus)
-from utils.password_utils import get_password_hash, verify_password
+from utils.password_utils import (get_password_hash_async,
+                                  verify_password_async)
 
+from .log_service import enqueue_log
 from .session_service import SessionService
 from .validation_service import ValidationService
 
@@ -80,9 +82,9 @@ class AuthService:
 
             # Check if user with this email already exists
             user_result = await self.db_session.execute(
-                select(UserModel).where(UserModel.email == normalized_email)
+                select(UserModel.id).where(UserModel.email == normalized_email)
             )
-            existing_user = user_result.scalars().first()
+            existing_user = user_result.scalar_one_or_none()
 
             if existing_user:
                 raise AuthServiceError(
@@ -97,7 +99,9 @@ class AuthService:
             )
 
             # Hash the password
-            password_hash = get_password_hash(register_data.password)
+            password_hash = await get_password_hash_async(
+                register_data.password
+            )
 
             # Create new user
             new_user = UserModel(
@@ -190,26 +194,32 @@ class AuthService:
                 login_data.email
             )
 
-            # Find user by email
+            # Find user by email, fetching only what login needs
             user_result = await self.db_session.execute(
-                select(UserModel).where(UserModel.email == normalized_email)
+                select(
+                    UserModel.id,
+                    UserModel.password_hash,
+                    UserModel.status,
+                    UserModel.role,
+                ).where(UserModel.email == normalized_email)
             )
-            user = user_result.scalars().first()
+            user = user_result.one_or_none()
 
-            # Log attempt
+            # Login audit entries go through the background log queue, so
+            # neither failed nor successful logins commit on this session
             log_message = f"Login attempt for email {normalized_email}"
             event_type = LogEventType.USER_LOGIN
+            ip_address = request.client.host
 
             # Verify credentials and user status
             if not user:
                 # Don't expose that user doesn't exist
-                log_entry = LogModel(
-                    event_type=event_type,
-                    ip_address=request.client.host,
-                    message=f"{log_message}: user not found",
+                enqueue_log(
+                    event_type,
+                    None,
+                    f"{log_message}: user not found",
+                    ip_address,
                 )
-                self.db_session.add(log_entry)
-                await self.db_session.commit()
 
                 raise AuthServiceError(
                     error_code="INVALID_CREDENTIALS",
@@ -217,19 +227,16 @@ class AuthService:
                     status_code=401,
                 )
 
-            # Add user_id to log now that we have it
-            log_entry = LogModel(
-                event_type=event_type,
-                user_id=user.id,
-                ip_address=request.client.host,
-                message=log_message,
-            )
-
             # Check if password is correct
-            if not verify_password(login_data.password, user.password_hash):
-                log_entry.message += ": invalid password"
-                self.db_session.add(log_entry)
-                await self.db_session.commit()
+            if not await verify_password_async(
+                login_data.password, user.password_hash
+            ):
+                enqueue_log(
+                    event_type,
+                    user.id,
+                    f"{log_message}: invalid password",
+                    ip_address,
+                )
 
                 raise AuthServiceError(
                     error_code="INVALID_CREDENTIALS",
@@ -239,9 +246,12 @@ class AuthService:
 
             # Check if user is active
             if user.status != "Active":
-                log_entry.message += f": user inactive (status={user.status})"
-                self.db_session.add(log_entry)
-                await self.db_session.commit()
+                enqueue_log(
+                    event_type,
+                    user.id,
+                    f"{log_message}: user inactive (status={user.status})",
+                    ip_address,
+                )
 
                 raise AuthServiceError(
                     error_code="USER_INACTIVE",
@@ -250,10 +260,6 @@ class AuthService:
                 )
 
             try:
-                # Update log message for successful login
-                log_entry.message += ": successful"
-                self.db_session.add(log_entry)
-
                 # Verify session_service is available and properly initialized
                 if self.session_service is None:
                     self.logger.error(
@@ -308,13 +314,18 @@ class AuthService:
                         status_code=500,
                     )
 
-                await self.db_session.commit()
+                # Log successful login
+                enqueue_log(
+                    event_type,
+                    user.id,
+                    f"{log_message}: successful",
+                    ip_address,
+                )
                 return True
             except AuthServiceError:
                 # Re-raise auth service errors
                 raise
             except Exception as e:
-                await self.db_session.rollback()
                 self.logger.error(f"Failed to process login: {str(e)}")
                 self.logger.debug(traceback.format_exc())
                 raise AuthServiceError(
@@ -372,21 +383,12 @@ class AuthService:
                     self.logger.warning("Failed to end session during logout")
 
                 # Log the logout event
-                try:
-                    log_entry = LogModel(
-                        event_type=LogEventType.USER_LOGIN,  # Use the same event type as login
-                        user_id=user_id,
-                        ip_address=request.client.host,
-                        message=f"User {user_id} logged out successfully",
-                    )
-
-                    self.db_session.add(log_entry)
-                    await self.db_session.commit()
-                except Exception as e:
-                    # Non-critical error - just log it but don't fail the logout
-                    await self.db_session.rollback()
-                    self.logger.error(f"Failed to log logout event: {str(e)}")
-                    self.logger.debug(traceback.format_exc())
+                enqueue_log(
+                    LogEventType.USER_LOGIN,  # Use the same event type as login
+                    user_id,
+                    f"User {user_id} logged out successfully",
+                    ip_address=request.client.host,
+                )
             else:
                 # Just make sure any cookies are cleared
                 try:
@@ -1,5 +1,6 @@
 import os
 from logging import Logger
+from typing import Optional, Tuple
 from uuid import uuid4
 
 import aiofiles
@@ -62,36 +63,29 @@ class FileService:
 
         return content
 
-    async def save_image(self, image: UploadFile) -> str:
+    async def prepare_image(self, image: UploadFile) -> Tuple[bytes, str]:
         """
-        Validates and saves an image file.
+        Validates an image and generates its storage filename without
+        writing anything to disk.
 
         Args:
             image: The uploaded image file
 
         Returns:
-            str: The saved image filename
+            Tuple[bytes, str]: The image content and the generated filename
 
         Raises:
-            HTTPException: If validation or saving fails
+            HTTPException: If validation fails
         """
         try:
-            if not image:
-                return None
-
             # Validate the image
             content = await self.validate_image(image)
 
             # Generate unique filename
             ext = image.filename.split(".")[-1].lower()
             image_filename = f"{uuid4()}.{ext}"
-            image_path = os.path.join(UPLOAD_DIR, image_filename)
 
-            # Save the file
-            async with aiofiles.open(image_path, "wb") as out_file:
-                await out_file.write(content)
-
-            return image_filename
+            return content, image_filename
         except HTTPException:
             raise
         except Exception as e:
@@ -103,3 +97,46 @@ class FileService:
                     "message": "Failed to upload the image",
                 },
             )
+
+    async def write_image(self, content: bytes, image_filename: str) -> None:
+        """
+        Writes image content prepared by prepare_image to the upload directory.
+
+        Args:
+            content: The image content
+            image_filename: The filename generated for the image
+        """
+        image_path = os.path.join(UPLOAD_DIR, image_filename)
+        async with aiofiles.open(image_path, "wb") as out_file:
+            await out_file.write(content)
+
+    async def save_image(self, image: UploadFile) -> Optional[str]:
+        """
+        Validates and saves an image file.
+
+        Args:
+            image: The uploaded image file
+
+        Returns:
+            str: The saved image filename
+
+        Raises:
+            HTTPException: If validation or saving fails
+        """
+        if not image:
+            return None
+
+        content, image_filename = await self.prepare_image(image)
+        try:
+            await self.write_image(content, image_filename)
+        except Exception as e:
+            self.logger.error(f"File upload error: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={
+                    "error_code": "FILE_UPLOAD_FAILED",
+                    "message": "Failed to upload the image",
+                },
+            )
+
+        return image_filename
@@ -1,15 +1,17 @@
-from datetime import datetime
 from decimal import Decimal
 from logging import Logger
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Type
 from uuid import UUID
 
 from fastapi import BackgroundTasks, HTTPException, UploadFile, status
-from sqlalchemy import case, func, or_
+from sqlalchemy import exists, func, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.elements import ColumnElement
 
-from models import CategoryModel, OfferModel, UserModel
+from models import CategoryModel, OfferModel
 from schemas import (CategoryDTO, LogEventType, OfferDetailDTO,
                      OfferListResponse, OfferStatus, OfferSummaryDTO,
                      SellerInfoDTO, UserRole)
@@ -17,13 +19,95 @@ from src.exceptions.offer_exceptions import (InvalidStatusTransitionException,
                                              NotOfferOwnerException,
                                              OfferAlreadyInactiveException,
                                              OfferAlreadySoldException,
+                                             OfferBaseException,
                                              OfferModificationFailedException,
                                              OfferNotFoundException)
+from utils.cache_utils import TTLCache
 from utils.pagination_utils import build_paginated_response
 
 from .file_service import FileService
 from .log_service import LogService
 
+# ORDER BY clauses for the non-search-dependent sort options
+_OFFER_SORT_ORDER = {
+    "price_asc": OfferModel.price.asc(),
+    "price_desc": OfferModel.price.desc(),
+    "created_at_desc": OfferModel.created_at.desc(),
+}
+_DEFAULT_OFFER_SORT_ORDER = _OFFER_SORT_ORDER["created_at_desc"]
+
+# Rows fetched per round trip when streaming offer lists
+_OFFER_STREAM_BATCH_SIZE = 200
+
+# Detail DTOs keyed by the versions of the rows they were built from
+_offer_detail_cache: TTLCache[OfferDetailDTO] = TTLCache(
+    maxsize=2048, ttl=300
+)
+
+
+class _StatusTransition(NamedTuple):
+    """Offer status change applied by OfferService._transition_status."""
+
+    # Name used in OfferModificationFailedException
+    operation: str
+    target_status: OfferStatus
+    # WHERE clause the current row must satisfy for the change to apply
+    condition: ColumnElement
+    # Additional column values; read-only so the shared default is safe
+    extra_values: Mapping[str, Any] = MappingProxyType({})
+    # Seller transitions require the Seller role and offer ownership
+    seller_only: bool = False
+    forbidden_message: Optional[str] = None
+    # Raised when the offer already has the target status
+    already_exception: Optional[Type[OfferBaseException]] = None
+    # 409 detail reported for any rejected moderation transition
+    conflict_detail: Optional[Dict[str, str]] = None
+    # Log message template (formatted with offer_id); None skips logging
+    log_message: Optional[str] = None
+
+
+_STATUS_TRANSITIONS = {
+    "deactivate": _StatusTransition(
+        operation="deactivate",
+        target_status=OfferStatus.INACTIVE,
+        condition=OfferModel.status == OfferStatus.ACTIVE,
+        seller_only=True,
+        forbidden_message="Only sellers can deactivate offers",
+        already_exception=OfferAlreadyInactiveException,
+        log_message="Offer {offer_id} deactivated",
+    ),
+    "mark_sold": _StatusTransition(
+        operation="mark_sold",
+        target_status=OfferStatus.SOLD,
+        condition=OfferModel.status.notin_(
+            [OfferStatus.SOLD, OfferStatus.ARCHIVED, OfferStatus.DELETED]
+        ),
+        extra_values=MappingProxyType({"quantity": 0}),
+        seller_only=True,
+        forbidden_message="Only sellers can mark offers as sold",
+        already_exception=OfferAlreadySoldException,
+        log_message="Offer {offer_id} marked as sold",
+    ),
+    "moderation": _StatusTransition(
+        operation="moderation",
+        target_status=OfferStatus.MODERATED,
+        condition=OfferModel.status != OfferStatus.MODERATED,
+        conflict_detail={
+            "error_code": "ALREADY_MODERATED",
+            "message": "Offer is already moderated",
+        },
+    ),
+    "unmoderation": _StatusTransition(
+        operation="unmoderation",
+        target_status=OfferStatus.INACTIVE,
+        condition=OfferModel.status == OfferStatus.MODERATED,
+        conflict_detail={
+            "error_code": "NOT_MODERATED",
+            "message": "Offer is not moderated",
+        },
+    ),
+}
+
 
 class OfferService:
     def __init__(self, db_session: AsyncSession, logger: Logger):
@@ -54,7 +138,8 @@ class OfferService:
             quantity: Quantity available (default 1)
             description: Optional product description
             image: Optional product image
-            background_tasks: Optional background tasks for async operations
+            background_tasks: Optional background tasks used to write the image
+                after commit (written inline when not provided)
 
         Returns:
             OfferSummaryDTO: The created offer details
@@ -63,33 +148,14 @@ class OfferService:
             HTTPException: If validation fails or database operation fails
         """
         try:
-            # Validate price
-            if price <= 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail={
-                        "error_code": "INVALID_PRICE",
-                        "message": "Price must be greater than 0",
-                    },
-                )
-
-            # Validate quantity
-            if quantity < 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail={
-                        "error_code": "INVALID_QUANTITY",
-                        "message": "Quantity cannot be negative",
-                    },
-                )
-
             # Verify category exists
-            result = await self.db_session.execute(
-                select(CategoryModel).where(CategoryModel.id == category_id)
-            )
-            category = result.scalars().first()
+            category_exists = (
+                await self.db_session.execute(
+                    select(exists().where(CategoryModel.id == category_id))
+                )
+            ).scalar()
 
-            if not category:
+            if not category_exists:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail={
@@ -98,10 +164,14 @@ class OfferService:
                     },
                 )
 
-            # Process image if provided
-            image_filename = None
+            # Validate the image and pick its filename; the file itself is
+            # written after commit so disk I/O doesn't hold the connection
+            image_content = image_filename = None
             if image:
-                image_filename = await self.file_service.save_image(image)
+                (
+                    image_content,
+                    image_filename,
+                ) = await self.file_service.prepare_image(image)
 
             # Create offer in database
             new_offer = OfferModel(
@@ -127,8 +197,7 @@ class OfferService:
             await self.db_session.commit()
             await self.db_session.refresh(new_offer)
 
-            # Convert to DTO and return
-            return OfferSummaryDTO(
+            offer_dto = OfferSummaryDTO(
                 id=new_offer.id,
                 seller_id=new_offer.seller_id,
                 category_id=new_offer.category_id,
@@ -140,6 +209,21 @@ class OfferService:
                 created_at=new_offer.created_at,
             )
 
+            if image_content is not None:
+                if background_tasks is not None:
+                    background_tasks.add_task(
+                        self._store_offer_image,
+                        new_offer.id,
+                        image_content,
+                        image_filename,
+                    )
+                elif not await self._store_offer_image(
+                    new_offer.id, image_content, image_filename
+                ):
+                    offer_dto.image_filename = None
+
+            return offer_dto
+
         except HTTPException:
             await self.db_session.rollback()
             raise
@@ -154,6 +238,45 @@ class OfferService:
                 },
             )
 
+    async def _store_offer_image(
+        self, offer_id: UUID, content: bytes, image_filename: str
+    ) -> bool:
+        """
+        Writes a committed offer's image to disk. If the write fails, the
+        offer's image_filename is cleared so it never points at a missing file.
+
+        Args:
+            offer_id: UUID of the offer the image belongs to
+            content: The image content
+            image_filename: The filename stored on the offer
+
+        Returns:
+            bool: True if the image was written
+        """
+        try:
+            await self.file_service.write_image(content, image_filename)
+            return True
+        except Exception as e:
+            self.logger.error(
+                f"Error storing image {image_filename} for offer {offer_id}: {str(e)}"
+            )
+            try:
+                await self.db_session.execute(
+                    update(OfferModel)
+                    .where(
+                        OfferModel.id == offer_id,
+                        OfferModel.image_filename == image_filename,
+                    )
+                    .values(image_filename=None)
+                )
+                await self.db_session.commit()
+            except Exception as reconcile_error:
+                await self.db_session.rollback()
+                self.logger.error(
+                    f"Error clearing image for offer {offer_id}: {str(reconcile_error)}"
+                )
+            return False
+
     async def deactivate_offer(
         self, offer_id: UUID, user_id: UUID, user_role: UserRole
     ) -> OfferDetailDTO:
@@ -171,85 +294,197 @@ class OfferService:
         Raises:
             HTTPException: Various exceptions based on validation and authorization
         """
-        try:
-            # Verify user is a seller
-            if user_role != UserRole.SELLER:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail={
-                        "error_code": "INSUFFICIENT_PERMISSIONS",
-                        "message": "Only sellers can deactivate offers",
-                    },
-                )
+        return await self._transition_status(
+            _STATUS_TRANSITIONS["deactivate"], offer_id, user_id, user_role
+        )
 
-            # Get the offer
-            offer = await self.db_session.get(OfferModel, offer_id)
+    async def mark_offer_as_sold(
+        self, offer_id: UUID, user_id: UUID, user_role: UserRole
+    ) -> OfferDetailDTO:
+        """
+        Mark an offer as sold by changing its status to 'sold' and setting quantity to 0
 
-            # Check if offer exists
-            if not offer:
-                raise OfferNotFoundException(offer_id)
+        Args:
+            offer_id: UUID of the offer to mark as sold
+            user_id: UUID of the current user
+            user_role: Role of the current user
 
-            # Check if user is the owner
-            if offer.seller_id != user_id:
-                raise NotOfferOwnerException(offer_id)
+        Returns:
+            OfferDetailDTO with the updated offer details
 
-            # Check if offer is already inactive
-            if offer.status == OfferStatus.INACTIVE:
-                raise OfferAlreadyInactiveException(offer_id)
+        Raises:
+            HTTPException: Various exceptions based on validation and authorization
+        """
+        return await self._transition_status(
+            _STATUS_TRANSITIONS["mark_sold"], offer_id, user_id, user_role
+        )
 
-            # Check if offer status allows deactivation (must be 'active')
-            if offer.status != OfferStatus.ACTIVE:
-                raise InvalidStatusTransitionException(
-                    current_status=offer.status,
-                    target_status=OfferStatus.INACTIVE,
-                )
+    async def moderate_offer(self, offer_id: UUID) -> OfferDetailDTO:
+        """
+        Moderates an offer by changing its status to 'moderated'.
+        """
+        return await self._transition_status(
+            _STATUS_TRANSITIONS["moderation"], offer_id
+        )
 
-            # Update offer status
-            offer.status = OfferStatus.INACTIVE
-            offer.updated_at = datetime.now()
+    async def unmoderate_offer(self, offer_id: UUID) -> OfferDetailDTO:
+        """
+        Unmoderates an offer by changing its status from 'moderated' to 'inactive'.
+        """
+        return await self._transition_status(
+            _STATUS_TRANSITIONS["unmoderation"], offer_id
+        )
 
-            # Save to database
-            await self.db_session.commit()
-            await self.db_session.refresh(offer)
+    async def _transition_status(
+        self,
+        transition: _StatusTransition,
+        offer_id: UUID,
+        user_id: Optional[UUID] = None,
+        user_role: Optional[UserRole] = None,
+    ) -> OfferDetailDTO:
+        """
+        Apply a status transition with a single guarded UPDATE ... RETURNING.
 
-            # Log the status change event
-            await self.log_service.create_log(
-                event_type=LogEventType.OFFER_STATUS_CHANGE,
-                user_id=user_id,
-                message=f"Offer {offer_id} deactivated",
-            )
+        Args:
+            transition: Transition to apply
+            offer_id: UUID of the offer to update
+            user_id: UUID of the current user (seller transitions only)
+            user_role: Role of the current user (seller transitions only)
 
-            # Fetch seller and category for full response
-            seller = await self.db_session.get(UserModel, offer.seller_id)
-            category = await self.db_session.get(
-                CategoryModel, offer.category_id
+        Returns:
+            OfferDetailDTO with the updated offer details
+
+        Raises:
+            OfferBaseException: If the offer is missing, not owned by the user
+                or not in a state the transition allows
+            HTTPException: If the user is not a seller, or on conflicts of
+                moderation transitions
+            OfferModificationFailedException: If the database operation fails
+        """
+        try:
+            conditions = [transition.condition]
+            if transition.seller_only:
+                # Verify user is a seller
+                if user_role != UserRole.SELLER:
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail={
+                            "error_code": "INSUFFICIENT_PERMISSIONS",
+                            "message": transition.forbidden_message,
+                        },
+                    )
+                conditions.append(OfferModel.seller_id == user_id)
+
+            # Update the offer only if it still satisfies the conditions
+            offer = await self._update_offer_returning(
+                offer_id,
+                *conditions,
+                status=transition.target_status,
+                **transition.extra_values,
             )
 
-            # Return detailed DTO
-            return self._map_to_offer_detail_dto(offer, seller, category)
+            if offer is None:
+                # Nothing was updated; load the offer to report why
+                offer = await self.db_session.get(OfferModel, offer_id)
+                if not offer:
+                    raise OfferNotFoundException(offer_id)
+                if transition.seller_only and offer.seller_id != user_id:
+                    raise NotOfferOwnerException(offer_id)
+                if transition.conflict_detail is not None:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=transition.conflict_detail,
+                    )
+                if offer.status == transition.target_status:
+                    raise transition.already_exception(offer_id)
+                raise InvalidStatusTransitionException(
+                    current_status=offer.status,
+                    target_status=transition.target_status,
+                )
+
+            # Load seller and category for the response
+            offer = await self._get_offer_with_relations(offer_id)
 
-        except (
-            OfferNotFoundException,
-            NotOfferOwnerException,
-            InvalidStatusTransitionException,
-            OfferAlreadyInactiveException,
-        ):
-            # Re-raise custom exceptions
-            raise
-        except HTTPException:
-            # Re-raise HTTP exceptions
+            if transition.log_message is not None:
+                # Log the status change event in the same transaction
+                await self.log_service.create_log(
+                    event_type=LogEventType.OFFER_STATUS_CHANGE,
+                    user_id=user_id,
+                    message=transition.log_message.format(offer_id=offer_id),
+                )
+
+            await self.db_session.commit()
+        except (OfferBaseException, HTTPException):
+            await self.db_session.rollback()
             raise
         except Exception as e:
-            # Log the error
-            self.logger.error(f"Error deactivating offer: {str(e)}")
+            await self.db_session.rollback()
+            self.logger.error(
+                f"Error during offer {transition.operation} of {offer_id}: {str(e)}"
+            )
             raise OfferModificationFailedException(
-                operation="deactivate", details=str(e)
+                operation=transition.operation, details=str(e)
+            )
+
+        return self._map_to_offer_detail_dto(
+            offer, offer.seller, offer.category
+        )
+
+    async def _get_offer_with_relations(
+        self, offer_id: UUID
+    ) -> Optional[OfferModel]:
+        """
+        Fetch an offer together with its seller and category in one query.
+
+        Args:
+            offer_id: UUID of the offer
+
+        Returns:
+            OfferModel with seller and category loaded, or None if not found
+        """
+        result = await self.db_session.execute(
+            select(OfferModel)
+            .options(
+                joinedload(OfferModel.seller),
+                joinedload(OfferModel.category),
             )
+            .where(OfferModel.id == offer_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _update_offer_returning(
+        self, offer_id: UUID, *conditions, **values
+    ) -> Optional[OfferModel]:
+        """
+        Update offer columns and read the new row back in one statement.
+
+        The update is applied atomically only if the row still matches all
+        conditions, so concurrent transitions cannot both succeed.
+
+        Args:
+            offer_id: UUID of the offer to update
+            *conditions: Extra WHERE clauses guarding the update
+            **values: Column values to set
+
+        Returns:
+            The updated OfferModel, or None if no row matched
+        """
+        result = await self.db_session.execute(
+            update(OfferModel)
+            .where(OfferModel.id == offer_id, *conditions)
+            .values(**values)
+            .returning(OfferModel)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
 
     def _map_to_offer_detail_dto(self, offer, seller, category):
         """
         Maps database models to OfferDetailDTO
 
+        DTOs are cached per row version; any update to the offer, seller or
+        category changes updated_at and therefore the cache key.
+
         Args:
             offer: OfferModel instance
             seller: UserModel instance
@@ -258,6 +493,20 @@ class OfferService:
         Returns:
             OfferDetailDTO with offer details, seller and category information
         """
+        cache_key = (
+            offer.id,
+            offer.updated_at,
+            offer.status,
+            offer.quantity,
+            seller.id,
+            seller.updated_at,
+            category.id,
+            category.updated_at,
+        )
+        cached_dto = _offer_detail_cache.get(cache_key)
+        if cached_dto is not None:
+            return cached_dto
+
         seller_info = SellerInfoDTO(
             id=seller.id,
             first_name=seller.first_name,
@@ -266,7 +515,7 @@ class OfferService:
 
         category_info = CategoryDTO(id=category.id, name=category.name)
 
-        return OfferDetailDTO(
+        offer_detail = OfferDetailDTO(
             id=offer.id,
             seller_id=offer.seller_id,
             category_id=offer.category_id,
@@ -281,98 +530,8 @@ class OfferService:
             seller=seller_info,
             category=category_info,
         )
-
-    async def mark_offer_as_sold(
-        self, offer_id: UUID, user_id: UUID, user_role: UserRole
-    ) -> OfferDetailDTO:
-        """
-        Mark an offer as sold by changing its status to 'sold' and setting quantity to 0
-
-        Args:
-            offer_id: UUID of the offer to mark as sold
-            user_id: UUID of the current user
-            user_role: Role of the current user
-
-        Returns:
-            OfferDetailDTO with the updated offer details
-
-        Raises:
-            HTTPException: Various exceptions based on validation and authorization
-        """
-        try:
-            # Verify user is a seller
-            if user_role != UserRole.SELLER:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail={
-                        "error_code": "INSUFFICIENT_PERMISSIONS",
-                        "message": "Only sellers can mark offers as sold",
-                    },
-                )
-
-            # Get the offer
-            offer = await self.db_session.get(OfferModel, offer_id)
-
-            # Check if offer exists
-            if not offer:
-                raise OfferNotFoundException(offer_id)
-
-            # Check if user is the owner
-            if offer.seller_id != user_id:
-                raise NotOfferOwnerException(offer_id)
-
-            # Check if offer is already sold
-            if offer.status == OfferStatus.SOLD:
-                raise OfferAlreadySoldException(offer_id)
-
-            # Check if offer status allows marking as sold (cannot be archived or deleted)
-            if offer.status in [OfferStatus.ARCHIVED, OfferStatus.DELETED]:
-                raise InvalidStatusTransitionException(
-                    current_status=offer.status, target_status=OfferStatus.SOLD
-                )
-
-            # Update offer status and quantity
-            offer.status = OfferStatus.SOLD
-            offer.quantity = 0
-            offer.updated_at = datetime.now()
-
-            # Save to database
-            await self.db_session.commit()
-            await self.db_session.refresh(offer)
-
-            # Log the status change event
-            await self.log_service.create_log(
-                event_type=LogEventType.OFFER_STATUS_CHANGE,
-                user_id=user_id,
-                message=f"Offer {offer_id} marked as sold",
-            )
-
-            # Fetch seller and category for full response
-            seller = await self.db_session.get(UserModel, offer.seller_id)
-            category = await self.db_session.get(
-                CategoryModel, offer.category_id
-            )
-
-            # Return detailed DTO
-            return self._map_to_offer_detail_dto(offer, seller, category)
-
-        except (
-            OfferNotFoundException,
-            NotOfferOwnerException,
-            InvalidStatusTransitionException,
-            OfferAlreadySoldException,
-        ):
-            # Re-raise custom exceptions
-            raise
-        except HTTPException:
-            # Re-raise HTTP exceptions
-            raise
-        except Exception as e:
-            # Log the error
-            self.logger.error(f"Error marking offer as sold: {str(e)}")
-            raise OfferModificationFailedException(
-                operation="mark_sold", details=str(e)
-            )
+        _offer_detail_cache.set(cache_key, offer_detail)
+        return offer_detail
 
     async def list_all_offers(
         self,
@@ -413,58 +572,65 @@ class OfferService:
             query = base_query.where(*filters) if filters else base_query
 
             # Sorting
-            if sort == "price_asc":
-                query = query.order_by(OfferModel.price.asc())
-            elif sort == "price_desc":
-                query = query.order_by(OfferModel.price.desc())
-            elif sort == "relevance" and search:
-                # Simple relevance: exact match first, prefix match next, then others
-                # Using term for ILIKE conditions
-                # term is defined above as f"%{search}%"
+            if sort == "relevance" and search:
+                # Rank by trigram similarity of the title to the search term
                 query = query.order_by(
-                    case(
-                        [
-                            (OfferModel.title.ilike(term), 1),
-                            (OfferModel.title.ilike(f"{search}%"), 2),
-                        ],
-                        else_=3,
-                    )
+                    func.similarity(OfferModel.title, search).desc(),
+                    _DEFAULT_OFFER_SORT_ORDER,
                 )
             else:
-                # default sort by creation date descending
-                query = query.order_by(OfferModel.created_at.desc())
-
-            # Count total
-            count_q = select(func.count()).select_from(query.subquery())
-            total = (await self.db_session.execute(count_q)).scalar() or 0
+                # Price or creation date; unknown values sort newest first
+                query = query.order_by(
+                    _OFFER_SORT_ORDER.get(sort, _DEFAULT_OFFER_SORT_ORDER)
+                )
 
-            # Fetch paginated data
-            result = await self.db_session.execute(
-                query.offset(offset).limit(limit)
+            # Stream the page together with the total match count, building
+            # DTOs as rows arrive instead of materializing the whole page.
+            # Column values are already typed by SQLAlchemy, so the DTOs are
+            # constructed without re-validation
+            stream = await self.db_session.stream(
+                query.add_columns(func.count().over().label("total"))
+                .offset(offset)
+                .limit(limit)
+                .execution_options(yield_per=_OFFER_STREAM_BATCH_SIZE)
             )
-            scalar_result = await result.scalars()
-            offers = scalar_result.all()
-
-            # Map to DTOs
-            items = [
-                OfferSummaryDTO(
-                    id=o.id,
-                    seller_id=o.seller_id,
-                    category_id=o.category_id,
-                    title=o.title,
-                    price=o.price,
-                    image_filename=o.image_filename,
-                    quantity=o.quantity,
-                    status=o.status,
-                    created_at=o.created_at,
+            items = []
+            total = None
+            async for o, total in stream:
+                items.append(
+                    OfferSummaryDTO.model_construct(
+                        id=o.id,
+                        seller_id=o.seller_id,
+                        category_id=o.category_id,
+                        title=o.title,
+                        price=o.price,
+                        image_filename=o.image_filename,
+                        quantity=o.quantity,
+                        status=o.status,
+                        created_at=o.created_at,
+                    )
                 )
-                for o in offers
-            ]
+
+            if total is None:
+                if offset > 0:
+                    # A page past the end has no rows to carry the total;
+                    # count the filtered table directly rather than wrapping
+                    # the sorted, eager-loading query in a subquery
+                    count_q = (
+                        select(func.count())
+                        .select_from(OfferModel)
+                        .where(*filters)
+                    )
+                    total = (
+                        await self.db_session.execute(count_q)
+                    ).scalar() or 0
+                else:
+                    total = 0
 
             # Build and return paginated response
             paginated = build_paginated_response(items, total, page, limit)
-            # Convert to OfferListResponse
-            return OfferListResponse(**paginated.model_dump())
+            # Convert to OfferListResponse without re-validating the items
+            return OfferListResponse.model_construct(**dict(paginated))
         except Exception as e:
             self.logger.error(f"Error fetching all offers: {str(e)}")
             raise HTTPException(
@@ -475,79 +641,6 @@ class OfferService:
                 },
             )
 
-    async def moderate_offer(self, offer_id: UUID) -> OfferDetailDTO:
-        """
-        Moderates an offer by changing its status to 'moderated'.
-        """
-        # Retrieve the offer
-        offer = await self.db_session.get(OfferModel, offer_id)
-        if not offer:
-            raise OfferNotFoundException(offer_id)
-        if offer.status == OfferStatus.MODERATED:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail={
-                    "error_code": "ALREADY_MODERATED",
-                    "message": "Offer is already moderated",
-                },
-            )
-        # Update status and timestamp
-        offer.status = OfferStatus.MODERATED
-        offer.updated_at = datetime.now()
-        try:
-            await self.db_session.commit()
-            await self.db_session.refresh(offer)
-        except HTTPException:
-            await self.db_session.rollback()
-            raise
-        except Exception as e:
-            await self.db_session.rollback()
-            self.logger.error(f"Error moderating offer {offer_id}: {str(e)}")
-            raise OfferModificationFailedException(
-                operation="moderation", details=str(e)
-            )
-        # Fetch related entities for full DTO
-        seller = await self.db_session.get(UserModel, offer.seller_id)
-        category = await self.db_session.get(CategoryModel, offer.category_id)
-        return self._map_to_offer_detail_dto(offer, seller, category)
-
-    async def unmoderate_offer(self, offer_id: UUID) -> OfferDetailDTO:
-        """
-        Unmoderates an offer by changing its status from 'moderated' to 'inactive'.
-        """
-        # Retrieve the offer
-        offer = await self.db_session.get(OfferModel, offer_id)
-        if not offer:
-            raise OfferNotFoundException(offer_id)
-        # Ensure the offer is currently moderated
-        if offer.status != OfferStatus.MODERATED:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail={
-                    "error_code": "NOT_MODERATED",
-                    "message": "Offer is not moderated",
-                },
-            )
-        # Update status and timestamp
-        offer.status = OfferStatus.INACTIVE
-        offer.updated_at = datetime.now()
-        try:
-            await self.db_session.commit()
-            await self.db_session.refresh(offer)
-        except HTTPException:
-            await self.db_session.rollback()
-            raise
-        except Exception as e:
-            await self.db_session.rollback()
-            self.logger.error(f"Error unmoderating offer {offer_id}: {str(e)}")
-            raise OfferModificationFailedException(
-                operation="unmoderation", details=str(e)
-            )
-        # Fetch related entities for full DTO
-        seller = await self.db_session.get(UserModel, offer.seller_id)
-        category = await self.db_session.get(CategoryModel, offer.category_id)
-        return self._map_to_offer_detail_dto(offer, seller, category)
-        
     async def search_offers(
         self,
         search: Optional[str] = None,
@@ -558,7 +651,7 @@ class OfferService:
     ) -> OfferListResponse:
         """
         Search and filter public offers with pagination.
-        Only returns active offers for public consumption.
+        Only returns active offers with stock left for public consumption.
 
         Args:
             search: Optional search term for title/description
@@ -574,8 +667,12 @@ class OfferService:
             # Calculate offset
             offset = (page - 1) * limit
 
-            # Base query - only include ACTIVE offers
-            base_query = select(OfferModel).where(OfferModel.status == OfferStatus.ACTIVE)
+            # Base query - only include ACTIVE offers with stock left; an
+            # offer fully reserved by unpaid orders stays ACTIVE at quantity 0
+            base_query = select(OfferModel).where(
+                OfferModel.status == OfferStatus.ACTIVE,
+                OfferModel.quantity > 0,
+            )
             filters = []
             
             if search:
@@ -593,24 +690,17 @@ class OfferService:
             query = base_query.where(*filters) if filters else base_query
 
             # Sorting
-            if sort == "price_asc":
-                query = query.order_by(OfferModel.price.asc())
-            elif sort == "price_desc":
-                query = query.order_by(OfferModel.price.desc())
-            elif sort == "relevance" and search:
-                # Simple relevance: exact match first, prefix match next, then others
+            if sort == "relevance" and search:
+                # Rank by trigram similarity of the title to the search term
                 query = query.order_by(
-                    case(
-                        [
-                            (OfferModel.title.ilike(search), 1),
-                            (OfferModel.title.ilike(f"{search}%"), 2),
-                        ],
-                        else_=3,
-                    )
+                    func.similarity(OfferModel.title, search).desc(),
+                    _DEFAULT_OFFER_SORT_ORDER,
                 )
             else:
-                # default sort by creation date descending
-                query = query.order_by(OfferModel.created_at.desc())
+                # Price or creation date; unknown values sort newest first
+                query = query.order_by(
+                    _OFFER_SORT_ORDER.get(sort, _DEFAULT_OFFER_SORT_ORDER)
+                )
 
             # Count total
             count_q = select(func.count()).select_from(query.subquery())
@@ -1,53 +1,93 @@
 import logging
 import uuid
+from collections import Counter
 from datetime import datetime
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func, join, select
+from sqlalchemy import (Integer, case, cast, func, insert, literal, select,
+                        update)
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from config import PAYMENT_GATEWAY_URL
-from models import (LogModel, OfferModel, OrderItemModel, OrderModel,
-                    TransactionModel, UserModel)
-from schemas import (CreateOrderRequest, LogEventType, OrderDetailDTO,
-                     OrderItemDTO, OrderListResponse, OrderStatus,
-                     OrderSummaryDTO, TransactionStatus, UserRole)
-
-
-async def log_event(
-    db_session: AsyncSession,
-    event_type: LogEventType,
-    user_id: UUID,
-    message: str,
-    ip_address: Optional[str] = None,
-) -> None:
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.exc import StaleDataError
+
+from config import ORDER_RESERVATION_MINUTES, PAYMENT_GATEWAY_URL
+from exceptions.base import ConflictError
+from models import (OfferModel, OrderItemModel, OrderModel, TransactionModel,
+                    UserModel)
+from schemas import (CreateOrderRequest, LogEventType, OfferStatus,
+                     OrderDetailDTO, OrderItemDTO, OrderListResponse,
+                     OrderStatus, OrderSummaryDTO, TransactionStatus,
+                     UserRole)
+
+from .log_service import enqueue_log
+
+# Payment gateway URL with the callback URL filled in once at import time
+_PAYMENT_URL_TEMPLATE = (
+    f"{PAYMENT_GATEWAY_URL}/pay?transaction_id={{transaction_id}}"
+    f"&amount={{amount}}&callback_url={PAYMENT_GATEWAY_URL}/payments/callback"
+)
+
+# Status for offers getting reserved stock back: paying for another order may
+# have marked the offer sold while this reservation still held part of its
+# stock, so the returned units make it sellable again
+RELEASED_OFFER_STATUS = case(
+    (
+        OfferModel.status == OfferStatus.SOLD,
+        literal(OfferStatus.ACTIVE, OfferModel.status.type),
+    ),
+    else_=OfferModel.status,
+)
+
+
+def _seller_has_items(order_id, seller_id: UUID):
     """
-    Helper function to log events to the database.
+    Build an EXISTS predicate telling whether an order contains any of the
+    seller's offers; the database can stop at the first matching item.
 
     Args:
-        db_session: Database session
-        event_type: Type of event from LogEventType enum
-        user_id: UUID of the user
-        message: Log message
-        ip_address: Optional IP address
+        order_id: Order UUID or an OrderModel.id column to correlate with
+        seller_id: UUID of the seller
+
+    Returns:
+        EXISTS clause usable as a filter or a selected column
     """
-    log = LogModel(
-        event_type=event_type,
-        user_id=user_id,
-        ip_address=ip_address,
-        message=message,
-        timestamp=datetime.utcnow(),
+    return (
+        select(OrderItemModel.id)
+        .join(OfferModel, OrderItemModel.offer_id == OfferModel.id)
+        .where(
+            OrderItemModel.order_id == order_id,
+            OfferModel.seller_id == seller_id,
+        )
+        .correlate(OrderModel)
+        .exists()
     )
 
-    db_session.add(log)
-    # Don't commit here, let the caller handle transaction
 
+def _order_detail_select(order_entity):
+    """
+    Build a SELECT of an order entity with its items eagerly joined and its
+    total summed by a correlated subquery.
 
-class ConflictError(Exception):
-    """Raised when there is a conflict with the current state of the resource."""
+    Args:
+        order_entity: OrderModel or an alias of it (e.g. over an UPDATE CTE)
+
+    Returns:
+        Select yielding rows of (order, order_total)
+    """
+    order_total = (
+        select(
+            func.sum(OrderItemModel.price_at_purchase * OrderItemModel.quantity)
+        )
+        .where(OrderItemModel.order_id == order_entity.id)
+        .correlate(order_entity)
+        .scalar_subquery()
+    )
+    return select(order_entity, order_total.label("order_total")).options(
+        joinedload(order_entity.items)
+    )
 
 
 class OrderService:
@@ -76,8 +116,7 @@ class OrderService:
             HTTPException: If validation fails or order creation fails
         """
         # Log order creation start
-        await log_event(
-            self.db_session,
+        enqueue_log(
             LogEventType.ORDER_PLACE_START,
             current_user.id,
             f"Order creation started for user {current_user.email} with {len(order_data.items)} items",
@@ -96,12 +135,36 @@ class OrderService:
 
         # Start transaction
         try:
-            # Validate items - check if offers exist and are available
+            # Fetch and lock all ordered offers in one query; rows are locked
+            # in id order so concurrent orders cannot deadlock or oversell
+            offer_ids = {item.offer_id for item in order_data.items}
+            # Prices also come back as integer cents so the order total is
+            # summed with int arithmetic instead of Decimal
+            offers_result = await self.db_session.execute(
+                select(
+                    OfferModel,
+                    cast(OfferModel.price * 100, Integer).label("price_cents"),
+                )
+                .where(OfferModel.id.in_(offer_ids))
+                .order_by(OfferModel.id)
+                .with_for_update()
+            )
             offers_map = {}
-            total_amount = Decimal("0.00")
+            price_cents_map = {}
+            for offer, price_cents in offers_result:
+                offers_map[offer.id] = offer
+                price_cents_map[offer.id] = price_cents
+
+            # Quantities requested per offer, summed over repeated items
+            requested_quantities = Counter()
+            for item in order_data.items:
+                requested_quantities[item.offer_id] += item.quantity
+
+            # Validate items - check if offers exist and are available
+            total_cents = 0
 
             for item in order_data.items:
-                offer = await self.db_session.get(OfferModel, item.offer_id)
+                offer = offers_map.get(item.offer_id)
 
                 # Check if offer exists
                 if not offer:
@@ -124,70 +187,99 @@ class OrderService:
                     )
 
                 # Check if quantity is sufficient
-                if offer.quantity < item.quantity:
+                if offer.quantity < requested_quantities[item.offer_id]:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail={
                             "error_code": "INSUFFICIENT_QUANTITY",
-                            "message": f"Insufficient quantity for offer {item.offer_id}. Available: {offer.quantity}, Requested: {item.quantity}",
+                            "message": f"Insufficient quantity for offer {item.offer_id}. Available: {offer.quantity}, Requested: {requested_quantities[item.offer_id]}",
                         },
                     )
 
-                # Store offer in map for later use
-                offers_map[str(item.offer_id)] = offer
+                # Add item total to order total
+                total_cents += price_cents_map[item.offer_id] * item.quantity
 
-                # Calculate item total and add to order total
-                item_total = offer.price * Decimal(str(item.quantity))
-                total_amount += item_total
+            total_amount = Decimal(total_cents).scaleb(-2)
 
-            # Create order record
-            order_id = uuid.uuid4()
-            order = OrderModel(
-                id=order_id,
-                buyer_id=current_user.id,
-                status=OrderStatus.PENDING_PAYMENT,
-                created_at=datetime.utcnow(),
+            # Reserve stock on the rows locked above; it is released again if
+            # the payment fails, the order is cancelled before payment or the
+            # reservation expires (see expire_pending_orders)
+            await self._adjust_offer_quantities(
+                {
+                    offer_id: -quantity
+                    for offer_id, quantity in requested_quantities.items()
+                }
             )
-            self.db_session.add(order)
-            await self.db_session.flush()  # Flush to get the order ID
-
-            # Create order items
-            for item in order_data.items:
-                offer = offers_map[str(item.offer_id)]
-                order_item = OrderItemModel(
-                    order_id=order_id,
-                    offer_id=item.offer_id,
-                    quantity=item.quantity,
-                    price_at_purchase=offer.price,
-                    offer_title=offer.title,
-                )
-                self.db_session.add(order_item)
 
-            # Create transaction record
+            # Create the order and its transaction in one statement: the
+            # order INSERT is a data-modifying CTE feeding the transaction
+            # INSERT, and created_at (set by the database) is read back
+            order_id = uuid.uuid4()
             transaction_id = uuid.uuid4()
-            transaction = TransactionModel(
-                id=transaction_id,
-                order_id=order_id,
-                status=TransactionStatus.FAIL,  # Default to fail until payment completes
-                amount=total_amount,
-                timestamp=datetime.utcnow(),
+            new_order = (
+                insert(OrderModel)
+                .values(
+                    id=order_id,
+                    buyer_id=current_user.id,
+                    status=OrderStatus.PENDING_PAYMENT,
+                )
+                .returning(OrderModel.id, OrderModel.created_at)
+                .cte("new_order")
+            )
+            new_transaction = (
+                insert(TransactionModel)
+                .from_select(
+                    ["id", "order_id", "status", "amount"],
+                    select(
+                        literal(transaction_id, TransactionModel.id.type),
+                        new_order.c.id,
+                        # Default to fail until payment completes
+                        literal(
+                            TransactionStatus.FAIL,
+                            TransactionModel.status.type,
+                        ),
+                        literal(total_amount, TransactionModel.amount.type),
+                    ),
+                )
+                .cte("new_transaction")
+            )
+            created_at = (
+                await self.db_session.execute(
+                    select(new_order.c.created_at).add_cte(new_transaction)
+                )
+            ).scalar_one()
+
+            # Create order items with a single multi-row INSERT
+            await self.db_session.execute(
+                insert(OrderItemModel),
+                [
+                    {
+                        "order_id": order_id,
+                        "offer_id": item.offer_id,
+                        "quantity": item.quantity,
+                        "price_at_purchase": offers_map[item.offer_id].price,
+                        "offer_title": offers_map[item.offer_id].title,
+                    }
+                    for item in order_data.items
+                ],
             )
-            self.db_session.add(transaction)
 
-            # Construct payment URL with transaction ID and callback URL
-            callback_url = f"{PAYMENT_GATEWAY_URL}/payments/callback"
-            payment_url = f"{PAYMENT_GATEWAY_URL}/pay?transaction_id={transaction_id}&amount={total_amount}&callback_url={callback_url}"
+            # Construct payment URL with transaction ID and amount
+            payment_url = _PAYMENT_URL_TEMPLATE.format(
+                transaction_id=transaction_id, amount=total_amount
+            )
 
             # Commit the transaction
             await self.db_session.commit()
 
-            # Log successful order creation
-            await log_event(
-                self.db_session,
+            # Log successful order creation, stamped with the order's own
+            # database timestamp so both records agree
+            enqueue_log(
                 LogEventType.ORDER_PLACE_SUCCESS,
                 current_user.id,
                 f"Order {order_id} created successfully for user {current_user.email} with total amount {total_amount}",
                 ip_address,
+                timestamp=created_at,
             )
 
             # Return the order details
@@ -195,12 +287,19 @@ class OrderService:
                 "order_id": order_id,
                 "payment_url": payment_url,
                 "status": OrderStatus.PENDING_PAYMENT,
-                "created_at": order.created_at,
+                "created_at": created_at,
             }
 
-        except HTTPException:
-            # Rollback transaction and re-raise HTTP exceptions
+        except HTTPException as e:
+            # Rollback transaction (releasing the offer locks) and re-raise
+            # HTTP exceptions; the rejection is logged through the queue
             await self.db_session.rollback()
+            enqueue_log(
+                LogEventType.ORDER_PLACE_FAIL,
+                current_user.id,
+                f"Order rejected for user {current_user.email}: {e.detail['message']}",
+                ip_address,
+            )
             raise
 
         except Exception as e:
@@ -210,8 +309,7 @@ class OrderService:
             self.logger.error(error_message)
 
             # Log order creation failure
-            await log_event(
-                self.db_session,
+            enqueue_log(
                 LogEventType.ORDER_PLACE_FAIL,
                 current_user.id,
                 error_message,
@@ -226,6 +324,93 @@ class OrderService:
                 },
             )
 
+    async def _adjust_offer_quantities(
+        self, deltas: Dict[UUID, int], release: bool = False
+    ) -> None:
+        """
+        Add the given deltas to offer quantities with a single UPDATE.
+
+        Args:
+            deltas: Quantity change per offer ID (negative to reserve stock)
+            release: Whether reserved stock is being returned, in which case
+                offers marked sold are made active again
+        """
+        if not deltas:
+            return
+        values = {
+            "quantity": OfferModel.quantity
+            + case(deltas, value=OfferModel.id, else_=0)
+        }
+        if release:
+            values["status"] = RELEASED_OFFER_STATUS
+        await self.db_session.execute(
+            update(OfferModel)
+            .where(OfferModel.id.in_(deltas))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def expire_pending_orders(self, cutoff: datetime) -> int:
+        """
+        Cancel orders still awaiting payment that were created before the
+        cutoff and release the stock they reserved.
+
+        Args:
+            cutoff: Orders created before this time are expired
+
+        Returns:
+            int: Number of orders cancelled
+        """
+        # The version is bumped so a payment callback or admin cancel
+        # holding an older copy of the order gets a StaleDataError
+        expired_orders = (
+            await self.db_session.execute(
+                update(OrderModel)
+                .where(
+                    OrderModel.status == OrderStatus.PENDING_PAYMENT,
+                    OrderModel.created_at < cutoff,
+                )
+                .values(
+                    status=OrderStatus.CANCELLED,
+                    version_id=OrderModel.version_id + 1,
+                )
+                .returning(OrderModel.id, OrderModel.buyer_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+        if not expired_orders:
+            return 0
+        expired_ids = [order.id for order in expired_orders]
+
+        reserved = (
+            select(
+                OrderItemModel.offer_id,
+                func.sum(OrderItemModel.quantity).label("quantity"),
+            )
+            .where(OrderItemModel.order_id.in_(expired_ids))
+            .group_by(OrderItemModel.offer_id)
+            .subquery()
+        )
+        await self.db_session.execute(
+            update(OfferModel)
+            .where(OfferModel.id == reserved.c.offer_id)
+            .values(
+                quantity=OfferModel.quantity + reserved.c.quantity,
+                status=RELEASED_OFFER_STATUS,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db_session.commit()
+
+        for order in expired_orders:
+            enqueue_log(
+                LogEventType.ORDER_CANCELLED,
+                order.buyer_id,
+                f"Order {order.id} cancelled: payment not received within "
+                f"{ORDER_RESERVATION_MINUTES} minutes",
+            )
+        return len(expired_orders)
+
     async def get_buyer_orders(
         self, buyer_id: UUID, page: int = 1, limit: int = 100
     ) -> OrderListResponse:
@@ -255,21 +440,8 @@ class OrderService:
             # Calculate offset
             offset = (page - 1) * limit
 
-            # Get total count of orders for this buyer
-            count_query = (
-                select(func.count())
-                .select_from(OrderModel)
-                .where(OrderModel.buyer_id == buyer_id)
-            )
-            total_count_result = await self.db_session.execute(count_query)
-            total_count = total_count_result.scalar()
-
-            # Calculate total pages
-            total_pages = (
-                (total_count + limit - 1) // limit if total_count > 0 else 1
-            )
-
-            # Build query to get orders with their total amount
+            # Get orders with their total amount, plus the total order count
+            # for this buyer in the same round trip
             query = (
                 select(
                     OrderModel,
@@ -277,6 +449,7 @@ class OrderService:
                         OrderItemModel.price_at_purchase
                         * OrderItemModel.quantity
                     ).label("total_amount"),
+                    func.count().over().label("total_count"),
                 )
                 .join(OrderItemModel, OrderItemModel.order_id == OrderModel.id)
                 .where(OrderModel.buyer_id == buyer_id)
@@ -290,6 +463,26 @@ class OrderService:
             result = await self.db_session.execute(query)
             rows = result.all()
 
+            if rows:
+                total_count = rows[0].total_count
+            elif offset > 0:
+                # A page past the end has no rows to carry the count
+                count_query = (
+                    select(func.count())
+                    .select_from(OrderModel)
+                    .where(OrderModel.buyer_id == buyer_id)
+                )
+                total_count = (
+                    await self.db_session.execute(count_query)
+                ).scalar() or 0
+            else:
+                total_count = 0
+
+            # Calculate total pages
+            total_pages = (
+                (total_count + limit - 1) // limit if total_count > 0 else 1
+            )
+
             # Transform to DTOs
             items = []
             for row in rows:
@@ -348,10 +541,13 @@ class OrderService:
                 f"get_order_details called - order_id: {order_id}, user_id: {user_id}, user_role: {user_role}"
             )
 
-            # First check if order exists
-            order_query = select(OrderModel).where(OrderModel.id == order_id)
-            order_result = await self.db_session.execute(order_query)
-            order = order_result.scalar_one_or_none()
+            # Fetch the order, its items and total; for sellers, whether the
+            # order contains any of their offers comes back in the same row
+            order_row = await self._fetch_order_detail_row(
+                order_id,
+                seller_id=user_id if user_role == UserRole.SELLER else None,
+            )
+            order = order_row[0] if order_row else None
 
             if not order:
                 self.logger.warning(f"Order not found: {order_id}")
@@ -400,29 +596,7 @@ class OrderService:
 
             elif user_role == UserRole.SELLER:
                 # Seller can only view orders that contain their offers
-                # Need to check if any of the order items belong to offers from this seller
-                seller_check_query = (
-                    select(func.count())
-                    .select_from(
-                        join(
-                            OrderItemModel,
-                            OfferModel,
-                            OrderItemModel.offer_id == OfferModel.id,
-                        )
-                    )
-                    .where(
-                        and_(
-                            OrderItemModel.order_id == order_id,
-                            OfferModel.seller_id == user_id,
-                        )
-                    )
-                )
-                seller_check_result = await self.db_session.execute(
-                    seller_check_query
-                )
-                seller_items_count = seller_check_result.scalar()
-
-                if seller_items_count == 0:
+                if not order_row.has_seller_items:
                     self.logger.warning(
                         f"Access denied - seller {user_id} has no items in order {order_id}"
                     )
@@ -444,41 +618,8 @@ class OrderService:
                     f"Admin access granted for user {user_id} to order {order_id}"
                 )
 
-            # Fetch order items with their details
-            items_query = select(OrderItemModel).where(
-                OrderItemModel.order_id == order_id
-            )
-            items_result = await self.db_session.execute(items_query)
-            order_items = items_result.scalars().all()
-
-            # Calculate total amount
-            total_amount = Decimal("0.00")
-            items_dto = []
-
-            for item in order_items:
-                item_total = item.price_at_purchase * item.quantity
-                total_amount += item_total
-
-                items_dto.append(
-                    OrderItemDTO(
-                        id=item.id,
-                        offer_id=item.offer_id,
-                        quantity=item.quantity,
-                        price_at_purchase=item.price_at_purchase,
-                        offer_title=item.offer_title,
-                    )
-                )
-
             # Create and return the OrderDetailDTO
-            return OrderDetailDTO(
-                id=order.id,
-                buyer_id=order.buyer_id,
-                status=order.status,
-                created_at=order.created_at,
-                updated_at=order.updated_at,
-                items=items_dto,
-                total_amount=total_amount,
-            )
+            return self._map_to_order_detail_dto(order, order_row.order_total)
 
         except HTTPException:
             # Re-raise HTTP exceptions
@@ -494,6 +635,65 @@ class OrderService:
                 },
             )
 
+    async def _fetch_order_detail_row(
+        self, order_id: UUID, seller_id: Optional[UUID] = None
+    ):
+        """
+        Fetch an order with its items eagerly joined and its total summed by
+        the database, in a single query.
+
+        Args:
+            order_id: UUID of the order
+            seller_id: If given, the row also carries a has_seller_items flag
+                telling whether the order contains any of this seller's offers
+
+        Returns:
+            Row of (OrderModel, order_total[, has_seller_items]), or None if
+            the order does not exist
+        """
+        order_query = _order_detail_select(OrderModel).where(
+            OrderModel.id == order_id
+        )
+        if seller_id is not None:
+            order_query = order_query.add_columns(
+                _seller_has_items(order_id, seller_id).label("has_seller_items")
+            )
+        result = await self.db_session.execute(order_query)
+        return result.unique().one_or_none()
+
+    def _map_to_order_detail_dto(
+        self, order: OrderModel, total_amount: Optional[Decimal]
+    ) -> OrderDetailDTO:
+        """
+        Maps an order with loaded items to OrderDetailDTO
+
+        Args:
+            order: OrderModel instance with items loaded
+            total_amount: Order total computed by the database (None if the
+                order has no items)
+
+        Returns:
+            OrderDetailDTO with order details and items
+        """
+        return OrderDetailDTO(
+            id=order.id,
+            buyer_id=order.buyer_id,
+            status=order.status,
+            created_at=order.created_at,
+            updated_at=order.updated_at,
+            items=[
+                OrderItemDTO(
+                    id=item.id,
+                    offer_id=item.offer_id,
+                    quantity=item.quantity,
+                    price_at_purchase=item.price_at_purchase,
+                    offer_title=item.offer_title,
+                )
+                for item in order.items
+            ],
+            total_amount=total_amount or Decimal("0.00"),
+        )
+
     async def get_seller_sales(
         self,
         seller_id: UUID,
@@ -516,17 +716,6 @@ class OrderService:
 
             offset = (page - 1) * limit
 
-            # Total count of distinct orders for this seller
-            count_query = (
-                select(func.count(func.distinct(OrderModel.id)))
-                .select_from(OrderModel)
-                .join(OrderItemModel, OrderModel.id == OrderItemModel.order_id)
-                .join(OfferModel, OrderItemModel.offer_id == OfferModel.id)
-                .where(OfferModel.seller_id == seller_id)
-            )
-            count_result = await self.db_session.execute(count_query)
-            total_count = count_result.scalar() or 0
-
             # Apply sorting based on the sort parameter
             if sort == "created_at_asc":
                 order_by_clause = OrderModel.created_at.asc()
@@ -551,7 +740,8 @@ class OrderService:
             else:  # Default to created_at_desc
                 order_by_clause = OrderModel.created_at.desc()
 
-            # Query orders with total amount
+            # Query orders with total amount, plus the total count of
+            # distinct orders for this seller in the same round trip
             query = (
                 select(
                     OrderModel.id,
@@ -562,6 +752,7 @@ class OrderService:
                         OrderItemModel.price_at_purchase
                         * OrderItemModel.quantity
                     ).label("total_amount"),
+                    func.count().over().label("total_count"),
                 )
                 .select_from(OrderModel)
                 .join(OrderItemModel, OrderModel.id == OrderItemModel.order_id)
@@ -580,6 +771,25 @@ class OrderService:
             result = await self.db_session.execute(query)
             records = result.all()
 
+            if records:
+                total_count = records[0].total_count
+            elif offset > 0:
+                # A page past the end has no rows to carry the count
+                count_query = (
+                    select(func.count(func.distinct(OrderModel.id)))
+                    .select_from(OrderModel)
+                    .join(
+                        OrderItemModel, OrderModel.id == OrderItemModel.order_id
+                    )
+                    .join(OfferModel, OrderItemModel.offer_id == OfferModel.id)
+                    .where(OfferModel.seller_id == seller_id)
+                )
+                total_count = (
+                    await self.db_session.execute(count_query)
+                ).scalar() or 0
+            else:
+                total_count = 0
+
             items = [
                 OrderSummaryDTO(
                     id=rec[0],
@@ -622,53 +832,12 @@ class OrderService:
             PermissionError: if seller does not own any items in the order
             ConflictError: if order is not in 'processing' status
         """
-        # Check if order exists
-        order_query = select(OrderModel).where(OrderModel.id == order_id)
-        order_result = await self.db_session.execute(order_query)
-        order = order_result.scalar_one_or_none()
-        if not order:
-            raise ValueError(f"Order {order_id} not found")
-
-        # Check order status
-        if order.status != OrderStatus.PROCESSING:
-            raise ConflictError(
-                "Order must be in 'processing' status to be shipped"
-            )
-
-        # Check seller ownership of at least one item
-        seller_check_query = (
-            select(func.count())
-            .select_from(
-                join(
-                    OrderItemModel,
-                    OfferModel,
-                    OrderItemModel.offer_id == OfferModel.id,
-                )
-            )
-            .where(
-                and_(
-                    OrderItemModel.order_id == order_id,
-                    OfferModel.seller_id == seller_id,
-                )
-            )
-        )
-        seller_items_count = (
-            await self.db_session.execute(seller_check_query)
-        ).scalar() or 0
-        if seller_items_count == 0:
-            raise PermissionError(
-                "Seller does not own any items in this order"
-            )
-
-        # Update order status and timestamp
-        order.status = OrderStatus.SHIPPED
-        order.updated_at = datetime.utcnow()
-        self.db_session.add(order)
-        await self.db_session.flush()
-
-        # Return detailed order info
-        return await self.get_order_details(
-            order_id, seller_id, UserRole.SELLER
+        return await self._transition_seller_order(
+            order_id,
+            seller_id,
+            expected_status=OrderStatus.PROCESSING,
+            target_status=OrderStatus.SHIPPED,
+            conflict_message="Order must be in 'processing' status to be shipped",
         )
 
     async def deliver_order(
@@ -681,53 +850,82 @@ class OrderService:
             PermissionError: if seller does not own any items in the order
             ConflictError: if order is not in 'shipped' status
         """
-        # Check if order exists
-        order_query = select(OrderModel).where(OrderModel.id == order_id)
-        order_result = await self.db_session.execute(order_query)
-        order = order_result.scalar_one_or_none()
-        if not order:
-            raise ValueError(f"Order {order_id} not found")
+        return await self._transition_seller_order(
+            order_id,
+            seller_id,
+            expected_status=OrderStatus.SHIPPED,
+            target_status=OrderStatus.DELIVERED,
+            conflict_message="Order must be in 'shipped' status to be delivered",
+        )
 
-        # Check order status
-        if order.status != OrderStatus.SHIPPED:
-            raise ConflictError(
-                "Order must be in 'shipped' status to be delivered"
-            )
+    async def _transition_seller_order(
+        self,
+        order_id: UUID,
+        seller_id: UUID,
+        expected_status: OrderStatus,
+        target_status: OrderStatus,
+        conflict_message: str,
+    ) -> OrderDetailDTO:
+        """
+        Move an order between statuses with a single guarded UPDATE that only
+        matches while the order is in expected_status and contains the
+        seller's offers; the updated order, its items and total are read
+        back in the same statement.
 
-        # Check seller ownership of at least one item
-        seller_check_query = (
-            select(func.count())
-            .select_from(
-                join(
-                    OrderItemModel,
-                    OfferModel,
-                    OrderItemModel.offer_id == OfferModel.id,
-                )
-            )
+        Args:
+            order_id: UUID of the order
+            seller_id: UUID of the seller performing the transition
+            expected_status: Status the order must currently have
+            target_status: Status to move the order to
+            conflict_message: Message of the ConflictError for a wrong status
+
+        Returns:
+            OrderDetailDTO of the updated order
+
+        Raises:
+            ValueError: if order not found
+            PermissionError: if seller does not own any items in the order
+            ConflictError: if order is not in expected_status
+        """
+        # updated_at is set by the column's onupdate; the version is bumped
+        # so ORM writers holding an older copy get a StaleDataError
+        updated_order = (
+            update(OrderModel)
             .where(
-                and_(
-                    OrderItemModel.order_id == order_id,
-                    OfferModel.seller_id == seller_id,
-                )
+                OrderModel.id == order_id,
+                OrderModel.status == expected_status,
+                _seller_has_items(order_id, seller_id),
+            )
+            .values(
+                status=target_status, version_id=OrderModel.version_id + 1
             )
+            .returning(*OrderModel.__table__.c)
+            .cte("updated_order")
+        )
+        result = await self.db_session.execute(
+            _order_detail_select(aliased(OrderModel, updated_order))
+            .execution_options(populate_existing=True)
         )
-        seller_items_count = (
-            await self.db_session.execute(seller_check_query)
-        ).scalar() or 0
-        if seller_items_count == 0:
+        order_row = result.unique().one_or_none()
+        if order_row:
+            return self._map_to_order_detail_dto(
+                order_row[0], order_row.order_total
+            )
+
+        # Nothing was updated: find out why, checking in the same order as
+        # the status and ownership rules are documented
+        order_row = await self._fetch_order_detail_row(order_id, seller_id)
+        if not order_row:
+            raise ValueError(f"Order {order_id} not found")
+        if order_row[0].status != expected_status:
+            raise ConflictError(conflict_message)
+        if not order_row.has_seller_items:
             raise PermissionError(
                 "Seller does not own any items in this order"
             )
-
-        # Update order status and timestamp
-        order.status = OrderStatus.DELIVERED
-        order.updated_at = datetime.utcnow()
-        self.db_session.add(order)
-        await self.db_session.flush()
-
-        # Return detailed order info
-        return await self.get_order_details(
-            order_id, seller_id, UserRole.SELLER
+        # The order changed between the UPDATE and this read
+        raise ConflictError(
+            f"Order {order_id} was modified concurrently, please retry"
         )
 
     async def get_admin_orders(
@@ -747,58 +945,67 @@ class OrderService:
         if limit < 1 or limit > 100:
             raise ValueError("Limit must be between 1 and 100")
 
-        # Build base query
-        base_query = select(OrderModel)
+        # Build filters; the seller filter is an EXISTS so orders with
+        # several of the seller's items are not duplicated
+        filters = []
         if status:
-            base_query = base_query.where(OrderModel.status == status)
+            filters.append(OrderModel.status == status)
         if buyer_id:
-            base_query = base_query.where(OrderModel.buyer_id == buyer_id)
+            filters.append(OrderModel.buyer_id == buyer_id)
         if seller_id:
-            base_query = (
-                base_query.join(OrderItemModel)
-                .join(OfferModel, OrderItemModel.offer_id == OfferModel.id)
-                .where(OfferModel.seller_id == seller_id)
-            )
-
-        # Count total orders for pagination
-        count_query = select(func.count()).select_from(base_query.subquery())
-        total = (await self.db_session.execute(count_query)).scalar() or 0
+            filters.append(_seller_has_items(OrderModel.id, seller_id))
 
-        # Apply pagination and ordering
+        # Fetch the page with order totals aggregated in SQL, plus the total
+        # order count for pagination in the same round trip
         offset = (page - 1) * limit
         result = await self.db_session.execute(
-            base_query.order_by(OrderModel.created_at.desc())
+            select(
+                OrderModel.id,
+                OrderModel.status,
+                OrderModel.created_at,
+                OrderModel.updated_at,
+                func.coalesce(
+                    func.sum(
+                        OrderItemModel.price_at_purchase
+                        * OrderItemModel.quantity
+                    ),
+                    0,
+                ).label("total_amount"),
+                func.count().over().label("total_count"),
+            )
+            .outerjoin(OrderItemModel, OrderItemModel.order_id == OrderModel.id)
+            .where(*filters)
+            .group_by(OrderModel.id)
+            .order_by(OrderModel.created_at.desc())
             .offset(offset)
             .limit(limit)
         )
-        orders = result.scalars().all()
+        rows = result.all()
+
+        if rows:
+            total = rows[0].total_count
+        elif offset > 0:
+            # A page past the end has no rows to carry the count
+            count_query = (
+                select(func.count()).select_from(OrderModel).where(*filters)
+            )
+            total = (await self.db_session.execute(count_query)).scalar() or 0
+        else:
+            total = 0
 
         # Calculate total pages
         pages = (total + limit - 1) // limit
 
-        # Map to DTOs with total_amount calculation
-        summaries: List[OrderSummaryDTO] = []
-        for order in orders:
-            # Fetch items for each order
-            items_res = await self.db_session.execute(
-                select(OrderItemModel).where(
-                    OrderItemModel.order_id == order.id
-                )
-            )
-            items = items_res.scalars().all()
-            # Calculate total amount
-            total_amount = sum(
-                item.quantity * item.price_at_purchase for item in items
-            )
-            summaries.append(
-                OrderSummaryDTO(
-                    id=order.id,
-                    status=order.status,
-                    total_amount=total_amount,
-                    created_at=order.created_at,
-                    updated_at=order.updated_at,
-                )
+        summaries: List[OrderSummaryDTO] = [
+            OrderSummaryDTO(
+                id=row.id,
+                status=row.status,
+                total_amount=row.total_amount,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
             )
+            for row in rows
+        ]
 
         return summaries, total, pages
 
@@ -806,12 +1013,11 @@ class OrderService:
         """
         Cancel an order by changing its status to 'cancelled'.
         """
-        # Retrieve the order
-        order_query = select(OrderModel).where(OrderModel.id == order_id)
-        result = await self.db_session.execute(order_query)
-        order = result.scalar_one_or_none()
-        if not order:
+        # Retrieve the order with its items and total
+        order_row = await self._fetch_order_detail_row(order_id)
+        if not order_row:
             raise ValueError(f"Order {order_id} not found")
+        order = order_row[0]
         # Ensure the order is not already cancelled or delivered
         if order.status == OrderStatus.CANCELLED:
             raise ValueError(f"Order {order_id} is already cancelled")
@@ -819,17 +1025,29 @@ class OrderService:
             raise ValueError(
                 f"Order {order_id} is already delivered and cannot be cancelled"
             )
-        # Update status and timestamp
+        # Release stock reserved by an order that was never paid for
+        if order.status == OrderStatus.PENDING_PAYMENT:
+            restocked_quantities = Counter()
+            for item in order.items:
+                restocked_quantities[item.offer_id] += item.quantity
+            await self._adjust_offer_quantities(
+                restocked_quantities, release=True
+            )
+        # Update status (updated_at is set by the database)
         order.status = OrderStatus.CANCELLED
-        order.updated_at = datetime.utcnow()
         self.db_session.add(order)
         try:
             await self.db_session.commit()
+        except StaleDataError:
+            # Another request changed the order since it was read
+            await self.db_session.rollback()
+            raise ConflictError(
+                f"Order {order_id} was modified concurrently and cannot be cancelled"
+            )
         except Exception as e:
             await self.db_session.rollback()
             self.logger.error(f"Failed to cancel order {order_id}: {str(e)}")
             raise Exception("Failed to cancel order")
         # Return the updated order details for admin
-        return await self.get_order_details(
-            order_id, order.buyer_id, UserRole.ADMIN
-        )
+        return self._map_to_order_detail_dto(order, order_row.order_total)
+
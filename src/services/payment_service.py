@@ -1,14 +1,14 @@
 import logging
-from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
 from models import OfferModel, OrderItemModel, OrderModel, TransactionModel
-from schemas import OrderStatus, TransactionStatus
+from schemas import OfferStatus, OrderStatus, TransactionStatus
 
-from .order_service import ConflictError
+from .order_service import RELEASED_OFFER_STATUS, ConflictError
 
 
 class PaymentResult:
@@ -31,7 +31,8 @@ class PaymentService:
         """
         Process a payment callback:
         - Update transaction and order status
-        - Adjust inventory on success
+        - Mark depleted offers sold on success, otherwise release reserved stock
+          (reactivating offers another order's payment marked sold)
         Raises:
             ValueError: transaction or order not found
             ConflictError: order already processed
@@ -72,31 +73,58 @@ class PaymentService:
             transaction.status = status
             self.db_session.add(transaction)
 
-            # Update order status and timestamp
+            # Update order status (updated_at is set by the database)
             order.status = new_order_status
-            order.updated_at = datetime.utcnow()
             self.db_session.add(order)
 
-            # On success, adjust inventory
+            # Stock was reserved when the order was created: on success mark
+            # depleted offers as sold, otherwise release the reservation.
+            # The order's offers are selected inside each UPDATE, so neither
+            # path loads items or offers first
             if status == TransactionStatus.SUCCESS:
-                items_query = select(OrderItemModel).where(
-                    OrderItemModel.order_id == order_id
+                await self.db_session.execute(
+                    update(OfferModel)
+                    .where(
+                        OfferModel.id.in_(
+                            select(OrderItemModel.offer_id).where(
+                                OrderItemModel.order_id == order_id
+                            )
+                        ),
+                        OfferModel.quantity == 0,
+                        OfferModel.status == OfferStatus.ACTIVE,
+                    )
+                    .values(status=OfferStatus.SOLD)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                reserved = (
+                    select(
+                        OrderItemModel.offer_id,
+                        func.sum(OrderItemModel.quantity).label("quantity"),
+                    )
+                    .where(OrderItemModel.order_id == order_id)
+                    .group_by(OrderItemModel.offer_id)
+                    .subquery()
                 )
-                items_result = await self.db_session.execute(items_query)
-                order_items = items_result.scalars().all()
-                for item in order_items:
-                    offer = await self.db_session.get(
-                        OfferModel, item.offer_id
+                # A payment for another order may have marked the offer sold
+                # while this one still held stock; reactivate it in the same
+                # statement
+                await self.db_session.execute(
+                    update(OfferModel)
+                    .where(OfferModel.id == reserved.c.offer_id)
+                    .values(
+                        quantity=OfferModel.quantity + reserved.c.quantity,
+                        status=RELEASED_OFFER_STATUS,
                     )
-                    if offer:
-                        offer.quantity = offer.quantity - item.quantity
-                        # Mark sold if depleted
-                        if offer.quantity == 0 and offer.status == "active":
-                            offer.status = "sold"
-                        self.db_session.add(offer)
+                    .execution_options(synchronize_session=False)
+                )
 
             # Commit changes
             await self.db_session.commit()
+        except StaleDataError:
+            # The order was cancelled or expired since it was read
+            await self.db_session.rollback()
+            raise ConflictError(f"Order {order_id} has already been processed")
         except Exception:
             await self.db_session.rollback()
             raise
@@ -0,0 +1,113 @@
+from typing import Optional
+from uuid import UUID
+
+import msgpack
+import redis.asyncio as redis
+
+from .session_service import SessionData
+
+
+def encode_session(data: SessionData) -> bytes:
+    """
+    Pack session data as msgpack: the raw 16 UUID bytes and the role.
+
+    Args:
+        data: Session data to store
+
+    Returns:
+        Compact binary representation (about 30 bytes)
+    """
+    return msgpack.packb((UUID(data.user_id).bytes, data.user_role))
+
+
+def decode_session(raw: bytes) -> SessionData:
+    """
+    Inverse of encode_session; skips validation as the data was written by
+    this backend.
+
+    Args:
+        raw: Bytes produced by encode_session
+
+    Returns:
+        Decoded SessionData
+    """
+    user_id, user_role = msgpack.unpackb(raw)
+    return SessionData.model_construct(
+        user_id=str(UUID(bytes=user_id)), user_role=user_role
+    )
+
+
+class RedisSessionBackend:
+    """
+    Session storage in Redis, shared by all workers and surviving restarts.
+    Redis expires each session after its TTL, so no cleanup runs in Python.
+
+    The IDs of each user's sessions are also kept in a set, so all of them
+    can be revoked at once. The set expires with the user's newest session.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        key_prefix: str = "session:",
+        user_key_prefix: str = "user_sessions:",
+    ):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.user_key_prefix = user_key_prefix
+
+    @classmethod
+    def from_url(
+        cls, url: str, max_connections: int = 50
+    ) -> "RedisSessionBackend":
+        """
+        Create a backend with its own pooled client.
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0
+            max_connections: Size of the client's connection pool
+
+        Returns:
+            RedisSessionBackend using a single shared client
+        """
+        client = redis.Redis.from_url(
+            url, max_connections=max_connections, decode_responses=False
+        )
+        return cls(client)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.user_key_prefix}{user_id}"
+
+    async def create(self, session_id: str, data: SessionData, ttl: int) -> None:
+        user_key = self._user_key(data.user_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(session_id), encode_session(data), ex=ttl)
+            pipe.sadd(user_key, session_id)
+            pipe.expire(user_key, ttl)
+            await pipe.execute()
+
+    async def read(self, session_id: str) -> Optional[SessionData]:
+        raw = await self.client.get(self._key(session_id))
+        if raw is None:
+            return None
+        try:
+            return decode_session(raw)
+        except (ValueError, TypeError):
+            # Unreadable (e.g. legacy JSON) sessions count as logged out
+            return None
+
+    async def delete(self, session_id: str) -> None:
+        # The ID stays in the user's set; deleting a missing key later is
+        # harmless and the set expires on its own
+        await self.client.delete(self._key(session_id))
+
+    async def delete_user_sessions(self, user_id: str) -> None:
+        user_key = self._user_key(user_id)
+        session_ids = await self.client.smembers(user_key)
+        await self.client.delete(
+            user_key,
+            *(self._key(session_id.decode()) for session_id in session_ids),
+        )
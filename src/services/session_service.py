@@ -1,5 +1,5 @@
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Protocol, Set
 from uuid import UUID, uuid4
 
 import jwt
@@ -12,6 +12,45 @@ class SessionData(BaseModel):
     user_role: str
 
 
+class SessionBackend(Protocol):
+    """Storage for server-side session data keyed by session ID"""
+
+    async def create(
+        self, session_id: str, data: SessionData, ttl: int
+    ) -> None: ...
+
+    async def read(self, session_id: str) -> Optional[SessionData]: ...
+
+    async def delete(self, session_id: str) -> None: ...
+
+    async def delete_user_sessions(self, user_id: str) -> None: ...
+
+
+class InMemorySessionBackend:
+    """Process-local session storage; sessions are lost on restart"""
+
+    def __init__(self):
+        self.sessions: Dict[str, SessionData] = {}
+        self.user_sessions: Dict[str, Set[str]] = {}
+
+    async def create(self, session_id: str, data: SessionData, ttl: int) -> None:
+        # Expiry is enforced by the JWT "exp" claim
+        self.sessions[session_id] = data
+        self.user_sessions.setdefault(data.user_id, set()).add(session_id)
+
+    async def read(self, session_id: str) -> Optional[SessionData]:
+        return self.sessions.get(session_id)
+
+    async def delete(self, session_id: str) -> None:
+        data = self.sessions.pop(session_id, None)
+        if data is not None:
+            self.user_sessions.get(data.user_id, set()).discard(session_id)
+
+    async def delete_user_sessions(self, user_id: str) -> None:
+        for session_id in self.user_sessions.pop(user_id, set()):
+            self.sessions.pop(session_id, None)
+
+
 class SessionService:
     """A simpler session service implementation using JWT-signed cookies"""
 
@@ -20,11 +59,12 @@ class SessionService:
         cookie_name: str = "session",
         cookie_max_age: int = 604800,  # 7 days in seconds
         secret_key: str = "CHANGE_ME_IN_PRODUCTION",
+        backend: Optional[SessionBackend] = None,
     ):
         self.cookie_name = cookie_name
         self.cookie_max_age = cookie_max_age
         self.secret_key = secret_key
-        self.sessions: Dict[str, SessionData] = {}
+        self.backend = backend or InMemorySessionBackend()
 
     async def create_session(
         self, response: Response, user_id: UUID, user_role: str
@@ -44,17 +84,19 @@ class SessionService:
             # Generate a session ID
             session_id = str(uuid4())
 
-            # Store session data in memory - convert UUID to string
+            # Store session data in the backend - convert UUID to string
             user_id_str = str(user_id)
             session_data = SessionData(
                 user_id=user_id_str, user_role=user_role
             )
-            self.sessions[session_id] = session_data
+            await self.backend.create(
+                session_id, session_data, self.cookie_max_age
+            )
 
             # Create a JWT token with the session ID
             payload = {
                 "session_id": session_id,
-                "exp": datetime.utcnow()
+                "exp": datetime.now(timezone.utc)
                 + timedelta(seconds=self.cookie_max_age),
             }
             token = jwt.encode(payload, self.secret_key, algorithm="HS256")
@@ -119,14 +161,51 @@ class SessionService:
             response.delete_cookie(key=self.cookie_name)
             return False
 
-        # Delete session from memory if it exists
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        # Delete session from the backend if it exists
+        await self.backend.delete(session_id)
 
         # Clear the cookie
         response.delete_cookie(key=self.cookie_name)
         return True
 
+    async def end_user_sessions(self, user_id: UUID) -> None:
+        """
+        End every session of a user, e.g. after the account is blocked.
+
+        Args:
+            user_id: User whose sessions are revoked
+        """
+        await self.backend.delete_user_sessions(str(user_id))
+
+    async def peek_session(self, request: Request) -> Optional[SessionData]:
+        """
+        Get the session data from a request without raising when the user
+        is not logged in.
+
+        Args:
+            request: FastAPI request object
+
+        Returns:
+            SessionData, or None if the cookie is missing, invalid, expired
+            or points to a session that no longer exists
+        """
+        token = request.cookies.get(self.cookie_name)
+        if not token:
+            return None
+
+        # Decode the JWT token (expired tokens are invalid tokens too)
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
+        except jwt.InvalidTokenError:
+            return None
+
+        session_id = payload.get("session_id")
+        if not session_id:
+            return None
+
+        # Get session data from the backend
+        return await self.backend.read(session_id)
+
     async def get_session(self, request: Request) -> SessionData:
         """
         Get the session data from a request.
@@ -141,33 +220,11 @@ class SessionService:
             HTTPException: If no valid session is found
         """
         try:
-            # Get session ID from cookie
-            token = request.cookies.get(self.cookie_name)
-            if not token:
-                raise ValueError("No session cookie found")
-
-            # Decode the JWT token
-            try:
-                payload = jwt.decode(
-                    token, self.secret_key, algorithms=["HS256"]
-                )
-            except jwt.ExpiredSignatureError:
-                raise ValueError("Session expired")
-            except jwt.InvalidTokenError:
-                raise ValueError("Invalid session token")
-
-            session_id = payload.get("session_id")
-            if not session_id:
-                raise ValueError("Invalid session token format")
-
-            # Get session data from memory
-            session_data = self.sessions.get(session_id)
-            if not session_data:
-                raise ValueError("Session not found in server memory")
-
-            return session_data
+            session_data = await self.peek_session(request)
         except Exception as e:
             print(f"Session error: {str(e)}")
+            session_data = None
+        if session_data is None:
             raise HTTPException(
                 status_code=401,
                 detail={
@@ -175,3 +232,4 @@ class SessionService:
                     "message": "User is not logged in.",
                 },
             )
+        return session_data
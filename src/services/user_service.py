@@ -1,4 +1,3 @@
-from datetime import datetime
 from logging import Logger
 from typing import List, Optional
 from uuid import UUID
@@ -11,13 +10,83 @@ from sqlalchemy.future import select
 from models import LogModel, UserModel
 from schemas import (ChangePasswordRequest, LogEventType, UpdateUserRequest,
                      UserDTO, UserListResponse, UserRole, UserStatus)
-from utils.password_utils import get_password_hash, verify_password
+from utils.password_utils import (get_password_hash_async,
+                                  verify_password_async)
+from utils.user_cache import UserCache
+
+from .session_service import SessionService
+
+
+# Columns selected (or returned by UPDATE ... RETURNING) to build a UserDTO
+_USER_DTO_COLUMNS = (
+    UserModel.id,
+    UserModel.email,
+    UserModel.role,
+    UserModel.status,
+    UserModel.first_name,
+    UserModel.last_name,
+    UserModel.created_at,
+    UserModel.updated_at,
+)
+
+
+def _to_user_dto(user) -> UserDTO:
+    """
+    Map a UserModel or a row of _USER_DTO_COLUMNS to UserDTO.
+
+    The values come straight from typed database columns, so the DTO is
+    built with model_construct and field validation is skipped.
+    """
+    return UserDTO.model_construct(
+        id=user.id,
+        email=user.email,
+        role=user.role,
+        status=user.status,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
 
 
 class UserService:
-    def __init__(self, db_session: AsyncSession, logger: Logger):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        logger: Logger,
+        user_cache: Optional[UserCache] = None,
+        session_service: Optional[SessionService] = None,
+    ):
         self.db_session = db_session
         self.logger = logger
+        self.user_cache = user_cache
+        self.session_service = session_service
+
+    async def _get_cached_user(self, user_id: UUID) -> Optional[UserDTO]:
+        """Return the cached profile of a user, if caching is enabled."""
+        if self.user_cache is None:
+            return None
+        return await self.user_cache.get(user_id)
+
+    async def _cache_user(self, user: UserDTO) -> None:
+        if self.user_cache is not None:
+            await self.user_cache.set(user)
+
+    async def _invalidate_cached_user(self, user_id: UUID) -> None:
+        """Drop a user's cached profile; call after the change is committed."""
+        if self.user_cache is not None:
+            await self.user_cache.invalidate(user_id)
+
+    async def _end_user_sessions(self, user_id: UUID) -> None:
+        """Log a user out everywhere; a failure does not undo the caller."""
+        if self.session_service is None:
+            return
+        try:
+            await self.session_service.end_user_sessions(user_id)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to end sessions of user {user_id}: {str(e)}"
+            )
 
     async def get_current_user(self, user_id: UUID) -> UserDTO:
         """
@@ -37,11 +106,15 @@ class UserService:
             user_id_str = str(user_id)
             self.logger.info(f"Looking up user with ID: {user_id_str}")
 
-            # Query database for user
+            cached_user = await self._get_cached_user(user_id)
+            if cached_user is not None:
+                return cached_user
+
+            # Query database for the profile columns only
             result = await self.db_session.execute(
-                select(UserModel).where(UserModel.id == user_id)
+                select(*_USER_DTO_COLUMNS).where(UserModel.id == user_id)
             )
-            user = result.scalars().first()
+            user = result.one_or_none()
 
             # Check if user exists
             if not user:
@@ -56,17 +129,10 @@ class UserService:
                     },
                 )
 
-            # Convert to DTO and return - make sure to convert UUID to string
-            return UserDTO(
-                id=str(user.id),  # Explicitly convert UUID to string
-                email=user.email,
-                role=user.role,
-                status=user.status,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                created_at=user.created_at,
-                updated_at=user.updated_at,
-            )
+            # Convert to DTO, cache and return
+            user_dto = _to_user_dto(user)
+            await self._cache_user(user_dto)
+            return user_dto
         except HTTPException:
             # Re-raise HTTP exceptions
             raise
@@ -101,11 +167,27 @@ class UserService:
             # Ensure user_id is correctly handled as string when needed
             user_id_str = str(user_id)
 
-            # Check if user exists
-            result = await self.db_session.execute(
-                select(UserModel).where(UserModel.id == user_id)
-            )
-            user = result.scalars().first()
+            # Prepare update data (only non-None fields)
+            update_values = {}
+            if update_data.first_name is not None:
+                update_values["first_name"] = update_data.first_name
+            if update_data.last_name is not None:
+                update_values["last_name"] = update_data.last_name
+
+            # Update the user and read the new values back in one statement;
+            # with nothing to change the profile is only read
+            if update_values:
+                result = await self.db_session.execute(
+                    update(UserModel)
+                    .where(UserModel.id == user_id)
+                    .values(**update_values)
+                    .returning(*_USER_DTO_COLUMNS)
+                )
+            else:
+                result = await self.db_session.execute(
+                    select(*_USER_DTO_COLUMNS).where(UserModel.id == user_id)
+                )
+            user = result.one_or_none()
 
             if not user:
                 self.logger.warning(
@@ -119,23 +201,6 @@ class UserService:
                     },
                 )
 
-            # Prepare update data (only non-None fields)
-            update_values = {}
-            if update_data.first_name is not None:
-                update_values["first_name"] = update_data.first_name
-            if update_data.last_name is not None:
-                update_values["last_name"] = update_data.last_name
-
-            # Add updated_at timestamp
-            update_values["updated_at"] = datetime.utcnow()
-
-            # Update user in database
-            await self.db_session.execute(
-                update(UserModel)
-                .where(UserModel.id == user_id)
-                .values(**update_values)
-            )
-
             # Log the action
             log_entry = LogModel(
                 event_type=LogEventType.USER_PROFILE_UPDATE,
@@ -146,21 +211,10 @@ class UserService:
 
             # Commit changes
             await self.db_session.commit()
-
-            # Refresh user object to get updated data
-            await self.db_session.refresh(user)
+            await self._invalidate_cached_user(user_id)
 
             # Return updated user - make sure to convert UUID to string
-            return UserDTO(
-                id=str(user.id),  # Explicitly convert UUID to string
-                email=user.email,
-                role=user.role,
-                status=user.status,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                created_at=user.created_at,
-                updated_at=user.updated_at,
-            )
+            return _to_user_dto(user)
 
         except HTTPException:
             # Re-raise HTTP exceptions
@@ -201,13 +255,13 @@ class UserService:
             # Ensure user_id is correctly handled as string when needed
             user_id_str = str(user_id)
 
-            # Find user by ID
+            # Fetch only the password hash
             result = await self.db_session.execute(
-                select(UserModel).where(UserModel.id == user_id)
+                select(UserModel.password_hash).where(UserModel.id == user_id)
             )
-            user = result.scalars().first()
+            password_hash = result.scalar_one_or_none()
 
-            if not user:
+            if password_hash is None:
                 self.logger.warning(
                     f"User with ID {user_id_str} not found during password change"
                 )
@@ -220,8 +274,8 @@ class UserService:
                 )
 
             # Verify current password
-            if not verify_password(
-                password_data.current_password, user.password_hash
+            if not await verify_password_async(
+                password_data.current_password, password_hash
             ):
                 # Log failed attempt
                 log_entry = LogModel(
@@ -245,7 +299,9 @@ class UserService:
             # but we could add additional checks here if needed
 
             # Hash new password
-            new_password_hash = get_password_hash(password_data.new_password)
+            new_password_hash = await get_password_hash_async(
+                password_data.new_password
+            )
 
             # Update user record with new password hash
             await self.db_session.execute(
@@ -253,7 +309,6 @@ class UserService:
                 .where(UserModel.id == user_id)
                 .values(
                     password_hash=new_password_hash,
-                    updated_at=datetime.utcnow(),
                 )
             )
 
@@ -268,6 +323,7 @@ class UserService:
 
             # Commit all changes
             await self.db_session.commit()
+            await self._invalidate_cached_user(user_id)
 
             return True
 
@@ -299,8 +355,8 @@ class UserService:
         try:
             offset = (page - 1) * limit
 
-            # Base query
-            base_query = select(UserModel)
+            # Base query; only the DTO columns, never the password hash
+            base_query = select(*_USER_DTO_COLUMNS)
 
             # Filter conditions
             filters = []
@@ -323,37 +379,31 @@ class UserService:
             if filters:
                 query = query.where(*filters)
             query = query.order_by(UserModel.created_at.desc())
-            
-            count_query = select(func.count()).select_from(
-                UserModel
-            )
-            if filters:
-                count_query = count_query.where(*filters)
-
-            # Fetch total count
-            total_count_result = await self.db_session.execute(count_query)
-            total = total_count_result.scalar() or 0
 
-            # Fetch paginated user data
+            # Fetch paginated user data together with the total count of
+            # matching users in one query
             users_result = await self.db_session.execute(
-                query.offset(offset).limit(limit)
+                query.add_columns(func.count().over().label("total"))
+                .offset(offset)
+                .limit(limit)
             )
-            users_db = users_result.scalars().all()
+            users_db = users_result.all()
+
+            if users_db:
+                total = users_db[0].total
+            elif offset > 0:
+                # A page past the end has no rows to carry the count
+                count_query = (
+                    select(func.count()).select_from(UserModel).where(*filters)
+                )
+                total = (
+                    await self.db_session.execute(count_query)
+                ).scalar() or 0
+            else:
+                total = 0
 
             # Transform to DTOs
-            items = [
-                UserDTO(
-                    id=str(u.id),  # Ensure UUID is converted to string
-                    email=u.email,
-                    role=u.role,
-                    status=u.status,
-                    first_name=u.first_name,
-                    last_name=u.last_name,
-                    created_at=u.created_at,
-                    updated_at=u.updated_at,
-                )
-                for u in users_db
-            ]
+            items = [_to_user_dto(u) for u in users_db]
 
             # Calculate pages
             pages = (total + limit - 1) // limit if total > 0 else 0
@@ -372,23 +422,20 @@ class UserService:
         Raises ValueError on DB errors.
         """
         try:
+            cached_user = await self._get_cached_user(user_id)
+            if cached_user is not None:
+                return cached_user
+
             result = await self.db_session.execute(
-                select(UserModel).where(UserModel.id == user_id)
+                select(*_USER_DTO_COLUMNS).where(UserModel.id == user_id)
             )
-            user = result.scalar_one_or_none()
+            user = result.one_or_none()
             if not user:
                 return None
             # Map to DTO excluding password
-            return UserDTO(
-                id=str(user.id),  # Ensure UUID is converted to string
-                email=user.email,
-                role=user.role,
-                status=user.status,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                created_at=user.created_at,
-                updated_at=user.updated_at,
-            )
+            user_dto = _to_user_dto(user)
+            await self._cache_user(user_dto)
+            return user_dto
         except Exception as e:
             self.logger.error(f"Error fetching user by ID: {str(e)}")
             raise ValueError(f"Failed to fetch user details: {str(e)}")
@@ -398,32 +445,33 @@ class UserService:
         Block a user by setting their status to 'Inactive'.
         """
         try:
-            # Fetch the user
+            # Update user status to Inactive unless it already is, reading
+            # the updated user back in the same statement
             result = await self.db_session.execute(
-                select(UserModel).where(UserModel.id == user_id)
+                update(UserModel)
+                .where(
+                    UserModel.id == user_id,
+                    UserModel.status != UserStatus.INACTIVE,
+                )
+                .values(status=UserStatus.INACTIVE)
+                .returning(*_USER_DTO_COLUMNS)
             )
-            user = result.scalars().first()
+            user = result.one_or_none()
             if not user:
-                raise ValueError(f"User with ID {user_id} not found")
-            if user.status == UserStatus.INACTIVE:
+                # Nothing updated: the user is missing or already inactive
+                exists = await self.db_session.scalar(
+                    select(UserModel.id).where(UserModel.id == user_id)
+                )
+                if exists is None:
+                    raise ValueError(f"User with ID {user_id} not found")
                 raise ValueError(f"User with ID {user_id} is already inactive")
-            
-            # Update user status to Inactive
-            user.status = UserStatus.INACTIVE
-            user.updated_at = datetime.utcnow()
             await self.db_session.commit()
-            
+            await self._invalidate_cached_user(user_id)
+            # A blocked user must not keep using existing sessions
+            await self._end_user_sessions(user_id)
+
             # Return updated user DTO
-            return UserDTO(
-                id=str(user.id),
-                email=user.email,
-                role=user.role,
-                status=user.status,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                created_at=user.created_at,
-                updated_at=user.updated_at,
-            )
+            return _to_user_dto(user)
         except ValueError:
             # Propagate known errors
             raise
@@ -443,32 +491,31 @@ class UserService:
         Unblock a user by setting their status to 'Active'.
         """
         try:
-            # Fetch the user
+            # Update user status to Active unless it already is, reading
+            # the updated user back in the same statement
             result = await self.db_session.execute(
-                select(UserModel).where(UserModel.id == user_id)
+                update(UserModel)
+                .where(
+                    UserModel.id == user_id,
+                    UserModel.status != UserStatus.ACTIVE,
+                )
+                .values(status=UserStatus.ACTIVE)
+                .returning(*_USER_DTO_COLUMNS)
             )
-            user = result.scalars().first()
+            user = result.one_or_none()
             if not user:
-                raise ValueError(f"User with ID {user_id} not found")
-            if user.status == UserStatus.ACTIVE:
+                # Nothing updated: the user is missing or already active
+                exists = await self.db_session.scalar(
+                    select(UserModel.id).where(UserModel.id == user_id)
+                )
+                if exists is None:
+                    raise ValueError(f"User with ID {user_id} not found")
                 raise ValueError(f"User with ID {user_id} is already active")
-            
-            # Update user status to Active
-            user.status = UserStatus.ACTIVE
-            user.updated_at = datetime.utcnow()
             await self.db_session.commit()
-            
+            await self._invalidate_cached_user(user_id)
+
             # Return updated user DTO
-            return UserDTO(
-                id=str(user.id),
-                email=user.email,
-                role=user.role,
-                status=user.status,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                created_at=user.created_at,
-                updated_at=user.updated_at,
-            )
+            return _to_user_dto(user)
         except ValueError:
             # Propagate known errors
             raise
@@ -1,7 +1,18 @@
-from passlib.context import CryptContext
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure the password context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import bcrypt
+
+# bcrypt cost factor for new hashes; the cost is stored in each hash, so
+# hashes created with another cost still verify
+BCRYPT_ROUNDS = 12
+
+# bcrypt is CPU-bound and releases the GIL, so hashing runs on this pool
+# instead of blocking the event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="password"
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -15,17 +26,59 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if the password matches, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(
+        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+    )
 
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """
     Hash a password using bcrypt.
 
+    Args:
+        password: The plain text password to hash
+        rounds: bcrypt cost factor
+
+    Returns:
+        str: The hashed password
+    """
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds)
+    ).decode("ascii")
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> bool:
+    """
+    Verify a password on the password thread pool without blocking the
+    event loop.
+
+    Args:
+        plain_password: The plain text password to verify
+        hashed_password: The hashed password to compare against
+
+    Returns:
+        bool: True if the password matches, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the password thread pool without blocking the
+    event loop.
+
     Args:
         password: The plain text password to hash
 
     Returns:
         str: The hashed password
     """
-    return pwd_context.hash(password)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, get_password_hash, password
+    )
@@ -0,0 +1,85 @@
+import logging
+from typing import Any, Optional
+from uuid import UUID
+
+from schemas import UserDTO
+from utils.cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Short-lived cache of user profiles keyed by user ID.
+
+    Profiles are kept in Redis when a client is given, so every worker sees
+    the same entries and invalidations; otherwise they are cached in this
+    process only. Cache errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        ttl: int = 60,
+        key_prefix: str = "user:",
+    ):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._local: TTLCache[UserDTO] = TTLCache(maxsize=10_000, ttl=ttl)
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    async def get(self, user_id: UUID) -> Optional[UserDTO]:
+        """
+        Return the cached profile for user_id, or None on a miss.
+
+        Args:
+            user_id: UUID of the user
+
+        Returns:
+            Cached UserDTO or None
+        """
+        if self.redis is None:
+            return self._local.get(str(user_id))
+        try:
+            raw = await self.redis.get(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"User cache read failed for {user_id}: {str(e)}")
+            return None
+        return UserDTO.model_validate_json(raw) if raw is not None else None
+
+    async def set(self, user: UserDTO) -> None:
+        """
+        Cache a user profile for the cache TTL.
+
+        Args:
+            user: Profile to cache
+        """
+        if self.redis is None:
+            self._local.set(str(user.id), user)
+            return
+        try:
+            await self.redis.set(
+                self._key(user.id), user.model_dump_json(), ex=self.ttl
+            )
+        except Exception as e:
+            logger.warning(f"User cache write failed for {user.id}: {str(e)}")
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """
+        Drop the cached profile of a user whose data has changed.
+
+        Args:
+            user_id: UUID of the user
+        """
+        if self.redis is None:
+            self._local.pop(str(user_id))
+            return
+        try:
+            await self.redis.delete(self._key(user_id))
+        except Exception as e:
+            logger.warning(
+                f"User cache invalidation failed for {user_id}: {str(e)}"
+            )
@@ -0,0 +1,69 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.schemas import LogEventType
+from src.services import log_service
+from src.services.log_service import (enqueue_log, flush_log_queue,
+                                      run_log_writer, stop_log_writer)
+
+
+@pytest.fixture
+def session_maker():
+    """Session factory whose sessions record the batches they insert."""
+    session = AsyncMock(spec=AsyncSession)
+    session_maker = MagicMock()
+    session_maker.return_value.__aenter__.return_value = session
+    session_maker.session = session
+    return session_maker
+
+
+def _written_messages(session_maker):
+    return [
+        entry["message"]
+        for call in session_maker.session.execute.await_args_list
+        for entry in call.args[1]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_queued_entries(session_maker):
+    user_id = uuid4()
+    for i in range(3):
+        enqueue_log(LogEventType.USER_LOGIN, user_id, f"login {i}")
+
+    writer = asyncio.create_task(run_log_writer(session_maker))
+    await stop_log_writer(writer)
+
+    # All three entries arrived within one flush interval: one INSERT
+    assert session_maker.session.execute.await_count == 1
+    assert _written_messages(session_maker) == ["login 0", "login 1", "login 2"]
+    session_maker.session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stopping_writer_keeps_partially_collected_batch(
+    session_maker, monkeypatch
+):
+    # A long flush interval keeps the writer collecting its first batch
+    monkeypatch.setattr(log_service, "_LOG_FLUSH_INTERVAL_SECONDS", 60)
+    writer = asyncio.create_task(run_log_writer(session_maker))
+    enqueue_log(LogEventType.USER_LOGIN, None, "first")
+    enqueue_log(LogEventType.USER_LOGIN, None, "second")
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(stop_log_writer(writer), timeout=1)
+
+    assert _written_messages(session_maker) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_flush_log_queue_writes_remaining_entries(session_maker):
+    enqueue_log(LogEventType.USER_LOGIN, None, "left behind")
+
+    await flush_log_queue(session_maker)
+
+    assert _written_messages(session_maker) == ["left behind"]
@@ -1,3 +1,4 @@
+from collections import namedtuple
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from logging import Logger
@@ -7,6 +8,7 @@ from uuid import UUID, uuid4
 
 import pytest
 from fastapi import HTTPException, UploadFile
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.exceptions.offer_exceptions import (InvalidStatusTransitionException,
@@ -93,7 +95,10 @@ def mock_logger():
 @pytest.fixture
 def mock_file_service():
     service = MagicMock(spec=FileService)
-    service.save_image = AsyncMock(return_value="test_image.jpg")
+    service.prepare_image = AsyncMock(
+        return_value=(b"image-bytes", "test_image.jpg")
+    )
+    service.write_image = AsyncMock()
     return service
 
 
@@ -115,7 +120,10 @@ def offer_service(
     mock_ls_instance = MockLogService.return_value
 
     # Configure their async methods if any are called directly in OfferService init or methods
-    mock_fs_instance.save_image = AsyncMock(return_value="test_image.jpg")
+    mock_fs_instance.prepare_image = AsyncMock(
+        return_value=(b"image-bytes", "test_image.jpg")
+    )
+    mock_fs_instance.write_image = AsyncMock()
     mock_ls_instance.create_log = AsyncMock()
 
     service = OfferService(db_session=mock_db_session, logger=mock_logger)
@@ -169,6 +177,8 @@ def mock_offer_model(mock_seller_user, mock_category):
         image_filename="test.jpg",
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc),
+        seller=mock_seller_user,
+        category=mock_category,
     )
 
 
@@ -203,9 +213,7 @@ async def test_create_offer_success_minimal(
     description = None  # Explicitly for clarity
     image_filename = None  # Explicitly for clarity
 
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = (
-        mock_category
-    )
+    mock_db_session.execute.return_value.scalar.return_value = True
 
     def side_effect_add(instance_being_added: OfferModel):
         instance_being_added.id = uuid4()
@@ -246,7 +254,8 @@ async def test_create_offer_success_minimal(
         user_id=seller_id,
         message=f"User {seller_id} created a new offer: {title}",
     )
-    offer_service.file_service.save_image.assert_not_awaited()
+    offer_service.file_service.prepare_image.assert_not_awaited()
+    offer_service.file_service.write_image.assert_not_awaited()
 
     # Check that an OfferModel instance was added to the session
     mock_db_session.add.assert_called_once()  # Assert it was called
@@ -283,11 +292,10 @@ async def test_create_offer_success_with_image(
     description = None
     expected_image_filename = "test_image.jpg"
 
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = (
-        mock_category
-    )
-    offer_service.file_service.save_image.return_value = (
-        expected_image_filename
+    mock_db_session.execute.return_value.scalar.return_value = True
+    offer_service.file_service.prepare_image.return_value = (
+        b"image-bytes",
+        expected_image_filename,
     )
 
     def side_effect_add_img(instance_being_added: OfferModel):
@@ -296,7 +304,7 @@ async def test_create_offer_success_with_image(
         instance_being_added.updated_at = datetime.now(timezone.utc)
         # OfferService sets image_filename on OfferModel before add,
         # so we don't need to set it here unless it's a DB-generated/modified name.
-        # For this test, file_service.save_image mock handles the name.
+        # For this test, file_service.prepare_image mock handles the name.
 
     mock_db_session.add.side_effect = side_effect_add_img
     mock_db_session.refresh = AsyncMock()
@@ -319,46 +327,70 @@ async def test_create_offer_success_with_image(
     assert result_dto.created_at is not None
     assert isinstance(result_dto.created_at, datetime)
     assert result_dto.image_filename == expected_image_filename
-    offer_service.file_service.save_image.assert_awaited_once_with(
+    offer_service.file_service.prepare_image.assert_awaited_once_with(
         mock_upload_file
     )
+    offer_service.file_service.write_image.assert_awaited_once_with(
+        b"image-bytes", expected_image_filename
+    )
     mock_db_session.commit.assert_awaited_once()
     offer_service.log_service.create_log.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_create_offer_invalid_price(
-    offer_service, mock_seller_user, mock_category
+async def test_create_offer_image_written_after_commit_in_background(
+    offer_service,
+    mock_db_session,
+    mock_seller_user,
+    mock_category,
+    mock_upload_file,
 ):
-    """Test offer creation with invalid price (<=0)."""
-    with pytest.raises(HTTPException) as exc_info:
-        await offer_service.create_offer(
-            seller_id=mock_seller_user.id,
-            title="Invalid Price Offer",
-            price=Decimal("0"),
-            category_id=mock_category.id,
-        )
-    assert exc_info.value.status_code == 400
-    assert exc_info.value.detail["error_code"] == "INVALID_PRICE"
-    offer_service.db_session.rollback.assert_awaited_once()
+    """Test the image write is scheduled as a background task after commit."""
+    mock_db_session.execute.return_value.scalar.return_value = True
+
+    def side_effect_add(instance_being_added: OfferModel):
+        instance_being_added.id = uuid4()
+        instance_being_added.created_at = datetime.now(timezone.utc)
+
+    mock_db_session.add.side_effect = side_effect_add
+    background_tasks = MagicMock()
+
+    result_dto = await offer_service.create_offer(
+        seller_id=mock_seller_user.id,
+        title="Background Image Offer",
+        price=Decimal("25.50"),
+        category_id=mock_category.id,
+        image=mock_upload_file,
+        background_tasks=background_tasks,
+    )
+
+    assert result_dto.image_filename == "test_image.jpg"
+    mock_db_session.commit.assert_awaited_once()
+    offer_service.file_service.write_image.assert_not_awaited()
+    background_tasks.add_task.assert_called_once_with(
+        offer_service._store_offer_image,
+        result_dto.id,
+        b"image-bytes",
+        "test_image.jpg",
+    )
 
 
 @pytest.mark.asyncio
-async def test_create_offer_invalid_quantity(
-    offer_service, mock_seller_user, mock_category
+async def test_store_offer_image_failure_clears_image_filename(
+    offer_service, mock_db_session
 ):
-    """Test offer creation with invalid quantity (<0)."""
-    with pytest.raises(HTTPException) as exc_info:
-        await offer_service.create_offer(
-            seller_id=mock_seller_user.id,
-            title="Invalid Quantity Offer",
-            price=Decimal("10"),
-            category_id=mock_category.id,
-            quantity=-1,
-        )
-    assert exc_info.value.status_code == 400
-    assert exc_info.value.detail["error_code"] == "INVALID_QUANTITY"
-    offer_service.db_session.rollback.assert_awaited_once()
+    """Test a failed image write clears the offer's image_filename."""
+    offer_service.file_service.write_image.side_effect = OSError("disk full")
+
+    stored = await offer_service._store_offer_image(
+        uuid4(), b"image-bytes", "test_image.jpg"
+    )
+
+    assert stored is False
+    mock_db_session.execute.assert_awaited_once()
+    statement = mock_db_session.execute.await_args.args[0]
+    assert "UPDATE offers SET image_filename" in str(statement)
+    mock_db_session.commit.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -367,9 +399,7 @@ async def test_create_offer_category_not_found(
 ):
     """Test offer creation with a non-existent category ID."""
     # Simulate category not found
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = (
-        None
-    )
+    mock_db_session.execute.return_value.scalar.return_value = False
 
     with pytest.raises(HTTPException) as exc_info:
         await offer_service.create_offer(
@@ -389,9 +419,7 @@ async def test_create_offer_db_commit_exception(
 ):
     """Test offer creation when database commit fails."""
     # Mock DB calls for category fetch
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = (
-        mock_category
-    )
+    mock_db_session.execute.return_value.scalar.return_value = True
     mock_db_session.commit.side_effect = Exception("DB commit error")
 
     with pytest.raises(HTTPException) as exc_info:
@@ -414,12 +442,10 @@ async def test_create_offer_file_service_exception(
     mock_category,
     mock_upload_file,
 ):
-    """Test offer creation when FileService.save_image fails."""
+    """Test offer creation when FileService.prepare_image fails."""
     # Mock DB calls for category fetch
-    mock_db_session.execute.return_value.scalars.return_value.first.return_value = (
-        mock_category
-    )
-    offer_service.file_service.save_image.side_effect = Exception(
+    mock_db_session.execute.return_value.scalar.return_value = True
+    offer_service.file_service.prepare_image.side_effect = Exception(
         "File save error"
     )
 
@@ -437,6 +463,25 @@ async def test_create_offer_file_service_exception(
     offer_service.db_session.rollback.assert_awaited_once()
 
 
+def _mock_update_returning(mock_db_session, offer, **values):
+    """Simulate UPDATE ... RETURNING refreshing the loaded offer in place."""
+
+    def apply_update():
+        for name, value in values.items():
+            setattr(offer, name, value)
+        return offer
+
+    mock_db_session.execute.return_value.scalar_one_or_none.side_effect = (
+        apply_update
+    )
+
+
+def _mock_update_rejected(mock_db_session, offer):
+    """Simulate a guarded UPDATE matching no row; offer is what a re-read finds."""
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = None
+    mock_db_session.get.return_value = offer
+
+
 # --- Tests for deactivate_offer ---
 
 
@@ -453,12 +498,9 @@ async def test_deactivate_offer_success(
     offer_to_deactivate.status = OfferStatus.ACTIVE  # Ensure it's active
     offer_to_deactivate.seller_id = mock_seller_user.id
 
-    # Simplified side_effect for db.get
-    mock_db_session.get.side_effect = [
-        offer_to_deactivate,  # For OfferModel
-        mock_seller_user,  # For UserModel (seller)
-        mock_category,  # For CategoryModel
-    ]
+    _mock_update_returning(
+        mock_db_session, offer_to_deactivate, status=OfferStatus.INACTIVE
+    )
 
     result_dto = await offer_service.deactivate_offer(
         offer_id=offer_to_deactivate.id,
@@ -472,7 +514,7 @@ async def test_deactivate_offer_success(
     )  # Check model was updated
     assert result_dto.id == offer_to_deactivate.id
     mock_db_session.commit.assert_awaited_once()
-    mock_db_session.refresh.assert_awaited_with(offer_to_deactivate)
+    mock_db_session.refresh.assert_not_awaited()
     offer_service.log_service.create_log.assert_awaited_once_with(
         event_type=LogEventType.OFFER_STATUS_CHANGE,
         user_id=mock_seller_user.id,
@@ -500,8 +542,7 @@ async def test_deactivate_offer_not_found(
     offer_service, mock_db_session, mock_seller_user
 ):
     """Test deactivation attempt for a non-existent offer."""
-    # Re-define get to ensure it's a fresh mock
-    mock_db_session.get = AsyncMock(return_value=None)
+    _mock_update_rejected(mock_db_session, None)
 
     # Use the helper function
     await assert_raises_exception(
@@ -521,7 +562,7 @@ async def test_deactivate_offer_not_owner(
     """Test deactivation attempt by a seller who is not the owner."""
     other_seller_id = uuid4()
     mock_offer_model.seller_id = other_seller_id
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
 
     await assert_raises_exception(
         func=lambda: offer_service.deactivate_offer(
@@ -540,7 +581,7 @@ async def test_deactivate_offer_already_inactive(
     """Test deactivation attempt on an offer that is already inactive."""
     mock_offer_model.status = OfferStatus.INACTIVE
     mock_offer_model.seller_id = mock_seller_user.id
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
 
     await assert_raises_exception(
         func=lambda: offer_service.deactivate_offer(
@@ -559,7 +600,7 @@ async def test_deactivate_offer_invalid_status(
     """Test deactivation attempt on an offer with a status that doesn't allow deactivation (e.g., SOLD)."""
     mock_offer_model.status = OfferStatus.SOLD
     mock_offer_model.seller_id = mock_seller_user.id
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
 
     await assert_raises_exception(
         func=lambda: offer_service.deactivate_offer(
@@ -580,7 +621,9 @@ async def test_deactivate_offer_db_commit_exception(
     offer_to_deactivate.status = OfferStatus.ACTIVE
     offer_to_deactivate.seller_id = mock_seller_user.id
 
-    mock_db_session.get.return_value = offer_to_deactivate
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = (
+        offer_to_deactivate
+    )
     mock_db_session.commit.side_effect = Exception("DB commit error")
 
     await assert_raises_exception(
@@ -614,11 +657,9 @@ async def test_mark_offer_as_sold_success(
     offer_to_sell.seller_id = mock_seller_user.id
     # initial_quantity = offer_to_sell.quantity # Not strictly needed for this simplified mock
 
-    mock_db_session.get.side_effect = [
-        offer_to_sell,
-        mock_seller_user,
-        mock_category,
-    ]
+    _mock_update_returning(
+        mock_db_session, offer_to_sell, status=OfferStatus.SOLD, quantity=0
+    )
 
     result_dto = await offer_service.mark_offer_as_sold(
         offer_id=offer_to_sell.id,
@@ -631,7 +672,7 @@ async def test_mark_offer_as_sold_success(
     assert offer_to_sell.quantity == 0
     assert result_dto.id == offer_to_sell.id
     mock_db_session.commit.assert_awaited_once()
-    mock_db_session.refresh.assert_awaited_with(offer_to_sell)
+    mock_db_session.refresh.assert_not_awaited()
     offer_service.log_service.create_log.assert_awaited_once_with(
         event_type=LogEventType.OFFER_STATUS_CHANGE,
         user_id=mock_seller_user.id,
@@ -639,6 +680,31 @@ async def test_mark_offer_as_sold_success(
     )
 
 
+@pytest.mark.asyncio
+async def test_mark_offer_as_sold_uses_guarded_update(
+    offer_service, mock_db_session, mock_seller_user, mock_offer_model
+):
+    """Test that ownership and status are checked by the UPDATE itself."""
+    mock_offer_model.seller_id = mock_seller_user.id
+    _mock_update_returning(
+        mock_db_session, mock_offer_model, status=OfferStatus.SOLD, quantity=0
+    )
+
+    await offer_service.mark_offer_as_sold(
+        offer_id=mock_offer_model.id,
+        user_id=mock_seller_user.id,
+        user_role=UserRole.SELLER,
+    )
+
+    update_stmt = mock_db_session.execute.call_args_list[0].args[0]
+    sql = str(update_stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE offers")
+    assert "offers.seller_id =" in sql
+    assert "offers.status NOT IN" in sql
+    assert "RETURNING" in sql
+    mock_db_session.get.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_mark_offer_as_sold_user_not_seller(
     offer_service, mock_offer_model
@@ -659,8 +725,7 @@ async def test_mark_offer_as_sold_not_found(
     offer_service, mock_db_session, mock_seller_user
 ):
     """Test marking a non-existent offer as sold."""
-    # Re-define get to ensure it's a fresh mock
-    mock_db_session.get = AsyncMock(return_value=None)
+    _mock_update_rejected(mock_db_session, None)
 
     await assert_raises_exception(
         func=lambda: offer_service.mark_offer_as_sold(
@@ -679,7 +744,7 @@ async def test_mark_offer_as_sold_not_owner(
     """Test marking as sold by a seller who is not the owner."""
     other_seller_id = uuid4()
     mock_offer_model.seller_id = other_seller_id
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
 
     await assert_raises_exception(
         func=lambda: offer_service.mark_offer_as_sold(
@@ -698,7 +763,7 @@ async def test_mark_offer_as_sold_already_sold(
     """Test marking as sold an offer that is already sold."""
     mock_offer_model.status = OfferStatus.SOLD
     mock_offer_model.seller_id = mock_seller_user.id
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
 
     await assert_raises_exception(
         func=lambda: offer_service.mark_offer_as_sold(
@@ -717,7 +782,7 @@ async def test_mark_offer_as_sold_invalid_status_archived(
     """Test marking as sold an offer that is archived (invalid transition)."""
     mock_offer_model.status = OfferStatus.ARCHIVED
     mock_offer_model.seller_id = mock_seller_user.id
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
 
     await assert_raises_exception(
         func=lambda: offer_service.mark_offer_as_sold(
@@ -738,7 +803,9 @@ async def test_mark_offer_as_sold_db_commit_exception(
     offer_to_sell.status = OfferStatus.ACTIVE
     offer_to_sell.seller_id = mock_seller_user.id
 
-    mock_db_session.get.return_value = offer_to_sell
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = (
+        offer_to_sell
+    )
     mock_db_session.commit.side_effect = Exception("DB commit error")
 
     await assert_raises_exception(
@@ -755,9 +822,57 @@ async def test_mark_offer_as_sold_db_commit_exception(
     )
 
 
+def test_map_to_offer_detail_dto_reuses_dto_for_same_row_version(
+    offer_service, mock_offer_model, mock_seller_user, mock_category
+):
+    """Test that detail DTOs are cached until the offer row changes."""
+    first = offer_service._map_to_offer_detail_dto(
+        mock_offer_model, mock_seller_user, mock_category
+    )
+    second = offer_service._map_to_offer_detail_dto(
+        mock_offer_model, mock_seller_user, mock_category
+    )
+    assert second is first
+
+    mock_offer_model.updated_at = mock_offer_model.updated_at + timedelta(
+        seconds=1
+    )
+    third = offer_service._map_to_offer_detail_dto(
+        mock_offer_model, mock_seller_user, mock_category
+    )
+    assert third is not first
+    assert third.updated_at == mock_offer_model.updated_at
+
+
 # --- Tests for list_all_offers ---
 
 
+OfferRow = namedtuple("OfferRow", ["OfferModel", "total"])
+
+
+class _AsyncRows:
+    """Minimal async-iterable stand-in for a streamed AsyncResult."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _mock_offer_stream(mock_db_session, offers, total):
+    """Stream result rows as returned by the windowed list query."""
+    mock_db_session.stream = AsyncMock(
+        return_value=_AsyncRows([OfferRow(offer, total) for offer in offers])
+    )
+
+
 @pytest.mark.asyncio
 async def test_list_all_offers_no_filters_default_sort(
     offer_service, mock_db_session, mock_offer_model
@@ -790,20 +905,8 @@ async def test_list_all_offers_no_filters_default_sort(
         ),
     ]
 
-    # Mock for count query
-    mock_count_result = MagicMock()
-    mock_count_result.scalar.return_value = len(offers_data)
-
-    # Mock for data query (scalars is now awaited)
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = offers_data
-
-    # Setup the mocks with the new flow
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=len(offers_data))),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    # Rows carry the windowed total alongside each offer
+    _mock_offer_stream(mock_db_session, offers_data, len(offers_data))
 
     response = await offer_service.list_all_offers(page=1, limit=10)
 
@@ -823,8 +926,11 @@ async def test_list_all_offers_no_filters_default_sort(
     assert response.limit == 10
     assert response.pages == 1
 
-    # Check that execute was called twice (once for count, once for data)
-    assert mock_db_session.execute.call_count == 2
+    # Rows and total come back from a single streamed query
+    mock_db_session.stream.assert_awaited_once()
+    mock_db_session.execute.assert_not_awaited()
+    stmt = mock_db_session.stream.call_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 200
 
 
 @pytest.mark.asyncio
@@ -845,16 +951,7 @@ async def test_list_all_offers_with_search_filter(
         created_at=datetime.now(timezone.utc),
     )
 
-    # Setup scalar_result mock
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = [filtered_offer]
-
-    # Reset execute mock
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=1)),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    _mock_offer_stream(mock_db_session, [filtered_offer], 1)
 
     response = await offer_service.list_all_offers(search=search_term)
     assert response.total == 1
@@ -879,16 +976,7 @@ async def test_list_all_offers_with_category_filter(
         created_at=datetime.now(timezone.utc),
     )
 
-    # Setup scalar_result mock
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = [filtered_offer_cat]
-
-    # Reset execute mock
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=1)),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    _mock_offer_stream(mock_db_session, [filtered_offer_cat], 1)
 
     response = await offer_service.list_all_offers(
         category_id=category_id_to_filter
@@ -915,16 +1003,7 @@ async def test_list_all_offers_with_status_filter(
         created_at=datetime.now(timezone.utc),
     )
 
-    # Setup scalar_result mock
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = [filtered_offer_status]
-
-    # Reset execute mock
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=1)),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    _mock_offer_stream(mock_db_session, [filtered_offer_status], 1)
 
     response = await offer_service.list_all_offers(
         status_filter=status_to_filter
@@ -958,22 +1037,28 @@ async def test_list_all_offers_sort_price_asc(offer_service, mock_db_session):
         created_at=datetime.now(timezone.utc),
     )
 
-    # Setup scalar_result mock with price-ordered data
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = [offer_cheaper, offer_expensive]
-
-    # Reset execute mock
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=2)),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    _mock_offer_stream(mock_db_session, [offer_cheaper, offer_expensive], 2)
 
     response = await offer_service.list_all_offers(sort="price_asc")
     assert response.total == 2
     assert response.items[0].price < response.items[1].price
 
 
+@pytest.mark.asyncio
+async def test_list_all_offers_sort_relevance_uses_trigram_similarity(
+    offer_service, mock_db_session
+):
+    """Test that relevance sorting ranks by pg_trgm title similarity."""
+    _mock_offer_stream(mock_db_session, [], 0)
+
+    await offer_service.list_all_offers(search="witcher", sort="relevance")
+
+    stmt = mock_db_session.stream.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "similarity(offers.title" in sql
+    assert "ILIKE" in sql
+
+
 @pytest.mark.asyncio
 async def test_list_all_offers_pagination(offer_service, mock_db_session):
     """Test pagination for listing offers."""
@@ -995,16 +1080,7 @@ async def test_list_all_offers_pagination(offer_service, mock_db_session):
     limit = 5
     expected_items_on_page = all_offers[(page - 1) * limit : page * limit]
 
-    # Setup scalar_result mock with paginated data
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = expected_items_on_page
-
-    # Reset execute mock
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=15)),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    _mock_offer_stream(mock_db_session, expected_items_on_page, 15)
 
     response = await offer_service.list_all_offers(page=page, limit=limit)
     assert response.total == 15
@@ -1017,16 +1093,7 @@ async def test_list_all_offers_pagination(offer_service, mock_db_session):
 @pytest.mark.asyncio
 async def test_list_all_offers_empty_result(offer_service, mock_db_session):
     """Test listing offers when no offers match criteria."""
-    # Setup scalar_result mock with empty list
-    scalar_result = MagicMock()
-    scalar_result.all.return_value = []
-
-    # Reset execute mock
-    mock_db_session.execute = AsyncMock()
-    mock_db_session.execute.side_effect = [
-        MagicMock(scalar=MagicMock(return_value=0)),
-        MagicMock(scalars=AsyncMock(return_value=scalar_result)),
-    ]
+    _mock_offer_stream(mock_db_session, [], 0)
 
     response = await offer_service.list_all_offers(search="NonExistentTerm")
     assert response.total == 0
@@ -1034,10 +1101,27 @@ async def test_list_all_offers_empty_result(offer_service, mock_db_session):
     assert response.pages == 0
 
 
+@pytest.mark.asyncio
+async def test_list_all_offers_page_past_end_counts_separately(
+    offer_service, mock_db_session
+):
+    """Test that a page past the end falls back to a count query."""
+    _mock_offer_stream(mock_db_session, [], 0)
+    mock_db_session.execute = AsyncMock(
+        return_value=MagicMock(scalar=MagicMock(return_value=7))
+    )
+
+    response = await offer_service.list_all_offers(page=3, limit=5)
+    assert response.total == 7
+    assert len(response.items) == 0
+    assert response.pages == 2
+    mock_db_session.execute.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_list_all_offers_db_exception(offer_service, mock_db_session):
     """Test listing offers when a database exception occurs."""
-    mock_db_session.execute.side_effect = Exception("DB query error")
+    mock_db_session.stream.side_effect = Exception("DB query error")
 
     with pytest.raises(HTTPException) as exc_info:
         await offer_service.list_all_offers()
@@ -1062,11 +1146,9 @@ async def test_moderate_offer_success(
         OfferStatus.ACTIVE
     )  # Can be any non-moderated status
 
-    mock_db_session.get.side_effect = [
-        offer_to_moderate,
-        mock_seller_user,  # Corresponds to offer.seller_id from mock_offer_model
-        mock_category,  # Corresponds to offer.category_id from mock_offer_model
-    ]
+    _mock_update_returning(
+        mock_db_session, offer_to_moderate, status=OfferStatus.MODERATED
+    )
 
     result_dto = await offer_service.moderate_offer(
         offer_id=offer_to_moderate.id
@@ -1075,15 +1157,14 @@ async def test_moderate_offer_success(
     assert result_dto.status == OfferStatus.MODERATED
     assert offer_to_moderate.status == OfferStatus.MODERATED
     mock_db_session.commit.assert_awaited_once()
-    mock_db_session.refresh.assert_awaited_with(offer_to_moderate)
+    mock_db_session.refresh.assert_not_awaited()
     # No log event for moderation in current service implementation
 
 
 @pytest.mark.asyncio
 async def test_moderate_offer_not_found(offer_service, mock_db_session):
     """Test moderating a non-existent offer."""
-    # Re-define get to ensure it's a fresh mock
-    mock_db_session.get = AsyncMock(return_value=None)
+    _mock_update_rejected(mock_db_session, None)
 
     await assert_raises_exception(
         func=lambda: offer_service.moderate_offer(offer_id=uuid4()),
@@ -1097,7 +1178,7 @@ async def test_moderate_offer_already_moderated(
 ):
     """Test moderating an offer that is already moderated."""
     mock_offer_model.status = OfferStatus.MODERATED
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
     with pytest.raises(HTTPException) as exc_info:
         await offer_service.moderate_offer(offer_id=mock_offer_model.id)
     assert exc_info.value.status_code == 409  # Conflict
@@ -1110,7 +1191,9 @@ async def test_moderate_offer_db_commit_exception(
 ):
     """Test moderating an offer when database commit fails."""
     mock_offer_model.status = OfferStatus.ACTIVE
-    mock_db_session.get.return_value = mock_offer_model
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = (
+        mock_offer_model
+    )
     mock_db_session.commit.side_effect = Exception("DB commit error")
 
     await assert_raises_exception(
@@ -1140,11 +1223,9 @@ async def test_unmoderate_offer_success(
     offer_to_unmoderate = mock_offer_model
     offer_to_unmoderate.status = OfferStatus.MODERATED
 
-    mock_db_session.get.side_effect = [
-        offer_to_unmoderate,
-        mock_seller_user,
-        mock_category,
-    ]
+    _mock_update_returning(
+        mock_db_session, offer_to_unmoderate, status=OfferStatus.INACTIVE
+    )
 
     result_dto = await offer_service.unmoderate_offer(
         offer_id=offer_to_unmoderate.id
@@ -1155,15 +1236,14 @@ async def test_unmoderate_offer_success(
     )  # Unmoderation sets to INACTIVE
     assert offer_to_unmoderate.status == OfferStatus.INACTIVE
     mock_db_session.commit.assert_awaited_once()
-    mock_db_session.refresh.assert_awaited_with(offer_to_unmoderate)
+    mock_db_session.refresh.assert_not_awaited()
     # No log event for unmoderation in current service implementation
 
 
 @pytest.mark.asyncio
 async def test_unmoderate_offer_not_found(offer_service, mock_db_session):
     """Test unmoderating a non-existent offer."""
-    # Re-define get to ensure it's a fresh mock
-    mock_db_session.get = AsyncMock(return_value=None)
+    _mock_update_rejected(mock_db_session, None)
 
     await assert_raises_exception(
         func=lambda: offer_service.unmoderate_offer(offer_id=uuid4()),
@@ -1177,7 +1257,7 @@ async def test_unmoderate_offer_not_moderated(
 ):
     """Test unmoderating an offer that is not currently moderated."""
     mock_offer_model.status = OfferStatus.ACTIVE  # Any non-moderated status
-    mock_db_session.get.return_value = mock_offer_model
+    _mock_update_rejected(mock_db_session, mock_offer_model)
     with pytest.raises(HTTPException) as exc_info:
         await offer_service.unmoderate_offer(offer_id=mock_offer_model.id)
     assert exc_info.value.status_code == 409  # Conflict
@@ -1190,7 +1270,9 @@ async def test_unmoderate_offer_db_commit_exception(
 ):
     """Test handling of database exception during offer unmoderation."""
     # Set up
-    mock_db_session.get.return_value = mock_offer_model
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = (
+        mock_offer_model
+    )
     mock_offer_model.status = OfferStatus.MODERATED
     mock_db_session.commit.side_effect = Exception("Test DB commit error")
 
@@ -1281,6 +1363,23 @@ async def test_search_offers_with_filters(offer_service, mock_db_session):
     assert mock_db_session.execute.call_count >= 1
 
 
+@pytest.mark.asyncio
+async def test_search_offers_hides_offers_without_stock(
+    offer_service, mock_db_session
+):
+    """Offers fully reserved by unpaid orders stay ACTIVE at quantity 0."""
+    count_mock = MagicMock()
+    count_mock.scalar.return_value = 0
+    mock_db_session.execute.side_effect = [count_mock, MagicMock()]
+
+    await offer_service.search_offers()
+
+    stmt = mock_db_session.execute.await_args_list[1].args[0]
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+    assert "offers.status = " in sql
+    assert "offers.quantity > " in sql
+
+
 @pytest.mark.asyncio
 async def test_search_offers_exception_handling(offer_service, mock_db_session):
     """Test exception handling in search_offers method."""
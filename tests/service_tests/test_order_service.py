@@ -0,0 +1,333 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.schemas import (CreateOrderRequest, OfferStatus, OrderStatus,
+                         UserRole)
+from src.services.order_service import (RELEASED_OFFER_STATUS, ConflictError,
+                                        OrderService)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _sql(mock_db_session, call_index):
+    """Compile the statement of the given execute call for PostgreSQL."""
+    stmt = mock_db_session.execute.await_args_list[call_index].args[0]
+    return " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+
+def _unique_result(row):
+    result = MagicMock()
+    result.unique.return_value.one_or_none.return_value = row
+    return result
+
+
+def _all_result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+def _row(order, order_total, has_seller_items=None):
+    """Row shaped like the results of _order_detail_select."""
+    row = MagicMock()
+    row.__getitem__.side_effect = [order].__getitem__
+    row.order_total = order_total
+    row.has_seller_items = has_seller_items
+    return row
+
+
+def _order(status=OrderStatus.PROCESSING, items=()):
+    return SimpleNamespace(
+        id=uuid4(),
+        buyer_id=uuid4(),
+        status=status,
+        created_at=NOW,
+        updated_at=None,
+        items=list(items),
+    )
+
+
+def _order_item(offer_id, quantity):
+    return SimpleNamespace(
+        id=1,
+        offer_id=offer_id,
+        quantity=quantity,
+        price_at_purchase=Decimal("10.00"),
+        offer_title="Game",
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_queued_logs(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.order_service.enqueue_log", MagicMock()
+    )
+
+
+@pytest.fixture
+def mock_db_session():
+    session = AsyncMock(spec=AsyncSession)
+    session.add = MagicMock()
+    return session
+
+
+@pytest.fixture
+def order_service(mock_db_session):
+    return OrderService(mock_db_session, MagicMock())
+
+
+@pytest.fixture
+def buyer():
+    return SimpleNamespace(
+        id=uuid4(), email="buyer@example.com", role=UserRole.BUYER
+    )
+
+
+@pytest.fixture
+def offer():
+    return SimpleNamespace(
+        id=uuid4(),
+        status=OfferStatus.ACTIVE,
+        quantity=5,
+        price=Decimal("19.99"),
+        title="Game",
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order_reserves_stock_and_inserts_order_with_transaction(
+    order_service, mock_db_session, buyer, offer
+):
+    created_at_result = MagicMock()
+    created_at_result.scalar_one.return_value = NOW
+    mock_db_session.execute.side_effect = [
+        [(offer, 1999)],  # offers locked FOR UPDATE, with price in cents
+        MagicMock(),  # stock reservation
+        created_at_result,  # order + transaction CTE
+        MagicMock(),  # order items
+    ]
+    order_data = CreateOrderRequest(
+        items=[
+            {"offer_id": offer.id, "quantity": 1},
+            {"offer_id": offer.id, "quantity": 2},
+        ]
+    )
+
+    result = await order_service.create_order(buyer, order_data)
+
+    assert result["status"] == OrderStatus.PENDING_PAYMENT
+    assert result["created_at"] == NOW
+    assert "amount=59.97" in result["payment_url"]
+
+    assert "FOR UPDATE" in _sql(mock_db_session, 0)
+    reserve_sql = _sql(mock_db_session, 1)
+    assert reserve_sql.startswith(
+        "UPDATE offers SET quantity=(offers.quantity + CASE offers.id WHEN"
+    )
+    reserve_params = mock_db_session.execute.await_args_list[1].args[0]
+    assert -3 in reserve_params.compile().params.values()
+
+    insert_sql = _sql(mock_db_session, 2)
+    assert insert_sql.startswith("WITH new_order AS (INSERT INTO orders")
+    assert "RETURNING orders.id, orders.created_at" in insert_sql
+    assert "new_transaction AS (INSERT INTO transactions" in insert_sql
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_order_checks_quantity_summed_over_repeated_items(
+    order_service, mock_db_session, buyer, offer
+):
+    offer.quantity = 2
+    mock_db_session.execute.side_effect = [[(offer, 1999)]]
+    order_data = CreateOrderRequest(
+        items=[
+            {"offer_id": offer.id, "quantity": 2},
+            {"offer_id": offer.id, "quantity": 1},
+        ]
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.create_order(buyer, order_data)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail["error_code"] == "INSUFFICIENT_QUANTITY"
+    # Nothing is reserved or inserted
+    assert mock_db_session.execute.await_count == 1
+    mock_db_session.rollback.assert_awaited_once()
+    mock_db_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cancel_pending_order_releases_reserved_stock(
+    order_service, mock_db_session
+):
+    offer_id = uuid4()
+    order = _order(
+        OrderStatus.PENDING_PAYMENT,
+        items=[_order_item(offer_id, 1), _order_item(offer_id, 2)],
+    )
+    mock_db_session.execute.side_effect = [
+        _unique_result(_row(order, Decimal("30.00"))),
+        MagicMock(),
+    ]
+
+    result = await order_service.cancel_order(order.id)
+
+    assert result.status == OrderStatus.CANCELLED
+    release = mock_db_session.execute.await_args_list[1].args[0]
+    release_sql = _sql(mock_db_session, 1)
+    assert release_sql.startswith(
+        "UPDATE offers SET quantity=(offers.quantity + CASE offers.id WHEN"
+    )
+    assert "status=CASE WHEN (offers.status = " in release_sql
+    assert 3 in release.compile().params.values()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cancel_order_changed_concurrently_is_a_conflict(
+    order_service, mock_db_session
+):
+    order = _order(OrderStatus.PROCESSING)
+    mock_db_session.execute.side_effect = [
+        _unique_result(_row(order, Decimal("0.00")))
+    ]
+    mock_db_session.commit.side_effect = StaleDataError("version mismatch")
+
+    with pytest.raises(ConflictError):
+        await order_service.cancel_order(order.id)
+    mock_db_session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ship_order_is_a_single_guarded_update(
+    order_service, mock_db_session
+):
+    order = _order(OrderStatus.SHIPPED)
+    mock_db_session.execute.return_value = _unique_result(
+        _row(order, Decimal("10.00"))
+    )
+
+    result = await order_service.ship_order(order.id, uuid4())
+
+    assert result.status == OrderStatus.SHIPPED
+    assert mock_db_session.execute.await_count == 1
+    sql = _sql(mock_db_session, 0)
+    assert sql.startswith("WITH updated_order AS (UPDATE orders SET")
+    assert "version_id=(orders.version_id +" in sql
+    assert "orders.status = " in sql
+    assert "EXISTS (SELECT order_items.id" in sql
+    assert "RETURNING orders.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_ship_order_explains_why_nothing_was_updated(
+    order_service, mock_db_session
+):
+    seller_id = uuid4()
+    delivered = _order(OrderStatus.DELIVERED)
+    not_owned = _order(OrderStatus.PROCESSING)
+    mock_db_session.execute.side_effect = [
+        _unique_result(None),
+        _unique_result(None),  # order does not exist
+        _unique_result(None),
+        _unique_result(_row(delivered, Decimal("0.00"), True)),
+        _unique_result(None),
+        _unique_result(_row(not_owned, Decimal("0.00"), False)),
+    ]
+
+    with pytest.raises(ValueError):
+        await order_service.ship_order(uuid4(), seller_id)
+    with pytest.raises(ConflictError):
+        await order_service.ship_order(delivered.id, seller_id)
+    with pytest.raises(PermissionError):
+        await order_service.ship_order(not_owned.id, seller_id)
+
+
+@pytest.mark.asyncio
+async def test_buyer_orders_total_comes_from_window_count(
+    order_service, mock_db_session
+):
+    order = _order()
+    row = MagicMock(total_count=7)
+    row.__getitem__.side_effect = [order, Decimal("10.00")].__getitem__
+    mock_db_session.execute.return_value = _all_result([row])
+
+    response = await order_service.get_buyer_orders(order.buyer_id, limit=5)
+
+    assert response.total == 7
+    assert response.pages == 2
+    assert mock_db_session.execute.await_count == 1
+    assert "count(*) OVER ()" in _sql(mock_db_session, 0)
+
+
+@pytest.mark.asyncio
+async def test_buyer_orders_page_past_the_end_counts_separately(
+    order_service, mock_db_session
+):
+    count_result = MagicMock()
+    count_result.scalar.return_value = 7
+    mock_db_session.execute.side_effect = [_all_result([]), count_result]
+
+    response = await order_service.get_buyer_orders(uuid4(), page=3, limit=5)
+
+    assert response.items == []
+    assert response.total == 7
+    assert _sql(mock_db_session, 1).startswith("SELECT count(*)")
+
+
+@pytest.mark.asyncio
+async def test_expire_pending_orders_cancels_and_releases_stock(
+    order_service, mock_db_session
+):
+    expired = [SimpleNamespace(id=uuid4(), buyer_id=uuid4()) for _ in range(2)]
+    mock_db_session.execute.side_effect = [_all_result(expired), MagicMock()]
+
+    assert await order_service.expire_pending_orders(NOW) == 2
+
+    expire_sql = _sql(mock_db_session, 0)
+    assert expire_sql.startswith("UPDATE orders SET status=")
+    assert "version_id=(orders.version_id +" in expire_sql
+    assert "orders.created_at < " in expire_sql
+    release_sql = _sql(mock_db_session, 1)
+    assert release_sql.startswith(
+        "UPDATE offers SET quantity=(offers.quantity + anon_1.quantity)"
+    )
+    assert "order_items.order_id IN" in release_sql
+    assert "status=CASE WHEN (offers.status = " in release_sql
+    mock_db_session.commit.assert_awaited_once()
+
+
+def test_released_offer_status_reactivates_sold_offers():
+    """Returned stock makes an offer sold by another order's payment active."""
+    sql = str(
+        RELEASED_OFFER_STATUS.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+    assert sql == (
+        "CASE WHEN (offers.status = 'SOLD') THEN 'ACTIVE' "
+        "ELSE offers.status END"
+    )
+
+
+@pytest.mark.asyncio
+async def test_expire_pending_orders_without_expired_orders(
+    order_service, mock_db_session
+):
+    mock_db_session.execute.return_value = _all_result([])
+
+    assert await order_service.expire_pending_orders(NOW) == 0
+    assert mock_db_session.execute.await_count == 1
+    mock_db_session.commit.assert_not_awaited()
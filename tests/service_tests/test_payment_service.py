@@ -0,0 +1,155 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.schemas import OrderStatus, TransactionStatus
+from src.services.payment_service import ConflictError, PaymentService
+
+
+def _scalar_result(value):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    return result
+
+
+@pytest.fixture
+def order():
+    return MagicMock(id=uuid4(), status=OrderStatus.PENDING_PAYMENT)
+
+
+@pytest.fixture
+def mock_db_session(order):
+    session = AsyncMock(spec=AsyncSession)
+    session.add = MagicMock()
+    transaction = MagicMock(id=uuid4(), order_id=order.id)
+    # Transaction, then order, then the stock UPDATE
+    session.execute.side_effect = [
+        _scalar_result(transaction),
+        _scalar_result(order),
+        MagicMock(),
+    ]
+    return session
+
+
+@pytest.fixture
+def payment_service(mock_db_session):
+    return PaymentService(mock_db_session, MagicMock())
+
+
+def _stock_update_sql(mock_db_session):
+    stmt = mock_db_session.execute.await_args_list[2].args[0]
+    return " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+
+@pytest.mark.asyncio
+async def test_successful_payment_marks_depleted_offers_sold(
+    payment_service, mock_db_session, order
+):
+    result = await payment_service.process_payment_callback(
+        uuid4(), TransactionStatus.SUCCESS
+    )
+
+    assert result.order_status == OrderStatus.PROCESSING
+    assert order.status == OrderStatus.PROCESSING
+    sql = _stock_update_sql(mock_db_session)
+    assert sql.startswith("UPDATE offers SET status=")
+    assert "offers.quantity = " in sql
+    assert "offers.id IN (SELECT order_items.offer_id" in sql
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_payment_releases_reserved_stock(
+    payment_service, mock_db_session, order
+):
+    result = await payment_service.process_payment_callback(
+        uuid4(), TransactionStatus.FAIL
+    )
+
+    assert result.order_status == OrderStatus.FAILED
+    sql = _stock_update_sql(mock_db_session)
+    assert sql.startswith(
+        "UPDATE offers SET quantity=(offers.quantity + anon_1.quantity)"
+    )
+    assert "sum(order_items.quantity)" in sql
+    assert "GROUP BY order_items.offer_id" in sql
+
+
+@pytest.mark.asyncio
+async def test_failed_payment_reactivates_offer_sold_by_another_order(
+    mock_db_session,
+):
+    """Stock 2, orders A and B reserve 1 each, A pays and B fails."""
+    order_a = MagicMock(id=uuid4(), status=OrderStatus.PENDING_PAYMENT)
+    order_b = MagicMock(id=uuid4(), status=OrderStatus.PENDING_PAYMENT)
+    mock_db_session.execute.side_effect = [
+        _scalar_result(MagicMock(order_id=order_a.id)),
+        _scalar_result(order_a),
+        MagicMock(),
+        _scalar_result(MagicMock(order_id=order_b.id)),
+        _scalar_result(order_b),
+        MagicMock(),
+    ]
+    payment_service = PaymentService(mock_db_session, MagicMock())
+
+    await payment_service.process_payment_callback(
+        uuid4(), TransactionStatus.SUCCESS
+    )
+    await payment_service.process_payment_callback(
+        uuid4(), TransactionStatus.FAIL
+    )
+
+    def literal_sql(call_index):
+        stmt = mock_db_session.execute.await_args_list[call_index].args[0]
+        compiled = stmt.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+        return " ".join(str(compiled).split())
+
+    # A's payment finds quantity 0 (B still holds the other unit) and
+    # marks the offer sold
+    sold_sql = literal_sql(2)
+    assert sold_sql.startswith("UPDATE offers SET status='SOLD'")
+    assert "offers.quantity = 0" in sold_sql
+    # B's failure returns its unit and reactivates the offer in the one
+    # release statement, leaving it ACTIVE with quantity 1
+    release_sql = literal_sql(5)
+    assert release_sql.startswith(
+        "UPDATE offers SET quantity=(offers.quantity + anon_1.quantity), "
+        "status=CASE WHEN (offers.status = 'SOLD') THEN 'ACTIVE' "
+        "ELSE offers.status END"
+    )
+    assert mock_db_session.execute.await_count == 6
+    assert mock_db_session.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_already_processed_order_is_a_conflict(
+    payment_service, mock_db_session, order
+):
+    order.status = OrderStatus.CANCELLED
+
+    with pytest.raises(ConflictError):
+        await payment_service.process_payment_callback(
+            uuid4(), TransactionStatus.SUCCESS
+        )
+    mock_db_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_order_changed_concurrently_is_a_conflict(
+    payment_service, mock_db_session
+):
+    """An admin cancel or expiry racing the callback bumps the version."""
+    mock_db_session.commit.side_effect = StaleDataError("version mismatch")
+
+    with pytest.raises(ConflictError):
+        await payment_service.process_payment_callback(
+            uuid4(), TransactionStatus.SUCCESS
+        )
+    mock_db_session.rollback.assert_awaited_once()
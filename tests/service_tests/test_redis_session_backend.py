@@ -0,0 +1,47 @@
+import json
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from src.services.redis_session_backend import (RedisSessionBackend,
+                                                decode_session,
+                                                encode_session)
+from src.services.session_service import SessionData
+
+
+def test_encode_decode_round_trip():
+    data = SessionData(user_id=str(uuid4()), user_role="Seller")
+
+    raw = encode_session(data)
+
+    assert len(raw) < 40
+    assert decode_session(raw) == data
+
+
+@pytest.mark.asyncio
+async def test_read_decodes_stored_session():
+    data = SessionData(user_id=str(uuid4()), user_role="Buyer")
+    client = AsyncMock()
+    client.get.return_value = encode_session(data)
+
+    assert await RedisSessionBackend(client).read("abc") == data
+    client.get.assert_awaited_once_with("session:abc")
+
+
+@pytest.mark.asyncio
+async def test_read_treats_legacy_json_session_as_logged_out():
+    client = AsyncMock()
+    client.get.return_value = json.dumps(
+        {"user_id": str(uuid4()), "user_role": "Buyer"}
+    ).encode()
+
+    assert await RedisSessionBackend(client).read("abc") is None
+
+
+@pytest.mark.asyncio
+async def test_read_missing_session():
+    client = AsyncMock()
+    client.get.return_value = None
+
+    assert await RedisSessionBackend(client).read("abc") is None
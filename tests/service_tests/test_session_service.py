@@ -0,0 +1,24 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import Response
+
+from src.services.session_service import (InMemorySessionBackend,
+                                          SessionService)
+
+
+@pytest.mark.asyncio
+async def test_end_user_sessions_revokes_only_that_users_sessions():
+    backend = InMemorySessionBackend()
+    service = SessionService(backend=backend)
+    user_id, other_user_id = uuid4(), uuid4()
+
+    first = await service.create_session(Response(), user_id, "Buyer")
+    second = await service.create_session(Response(), user_id, "Buyer")
+    other = await service.create_session(Response(), other_user_id, "Seller")
+
+    await service.end_user_sessions(user_id)
+
+    assert await backend.read(first) is None
+    assert await backend.read(second) is None
+    assert (await backend.read(other)).user_id == str(other_user_id)
@@ -0,0 +1,159 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.schemas import UpdateUserRequest, UserRole, UserStatus
+from src.services.user_service import UserService
+
+
+def _sql(mock_db_session, call_index=0):
+    """Compile the statement of the given execute call for PostgreSQL."""
+    stmt = mock_db_session.execute.await_args_list[call_index].args[0]
+    return " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+
+def _user_row(user_id, status=UserStatus.ACTIVE, first_name="Jan"):
+    """Row of the columns UserService selects or returns for a UserDTO."""
+    return SimpleNamespace(
+        id=user_id,
+        email="user@example.com",
+        role=UserRole.BUYER,
+        status=status,
+        first_name=first_name,
+        last_name="Kowalski",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+
+
+def _one_or_none_result(row):
+    result = MagicMock()
+    result.one_or_none.return_value = row
+    return result
+
+
+@pytest.fixture
+def mock_db_session():
+    session = AsyncMock(spec=AsyncSession)
+    session.add = MagicMock()
+    return session
+
+
+@pytest.fixture
+def user_cache():
+    return AsyncMock()
+
+
+@pytest.fixture
+def session_service():
+    return AsyncMock()
+
+
+@pytest.fixture
+def user_service(mock_db_session, user_cache, session_service):
+    return UserService(
+        mock_db_session, MagicMock(), user_cache, session_service
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_user_profile_updates_and_returns_in_one_statement(
+    user_service, mock_db_session, user_cache
+):
+    user_id = uuid4()
+    mock_db_session.execute.return_value = _one_or_none_result(
+        _user_row(user_id, first_name="Adam")
+    )
+
+    user = await user_service.update_user_profile(
+        user_id, UpdateUserRequest(first_name="Adam")
+    )
+
+    assert user.first_name == "Adam"
+    sql = _sql(mock_db_session)
+    assert sql.startswith("UPDATE users SET first_name=")
+    assert "last_name=" not in sql.split("WHERE")[0]
+    assert "RETURNING users.id, users.email" in sql
+    mock_db_session.commit.assert_awaited_once()
+    user_cache.invalidate.assert_awaited_once_with(user_id)
+
+
+@pytest.mark.asyncio
+async def test_block_user_is_a_guarded_update_returning_the_user(
+    user_service, mock_db_session, user_cache, session_service
+):
+    user_id = uuid4()
+    mock_db_session.execute.return_value = _one_or_none_result(
+        _user_row(user_id, status=UserStatus.INACTIVE)
+    )
+
+    user = await user_service.block_user(user_id)
+
+    assert user.status == UserStatus.INACTIVE
+    sql = _sql(mock_db_session)
+    assert sql.startswith("UPDATE users SET status=")
+    assert "users.status != " in sql
+    assert "RETURNING users.id" in sql
+    mock_db_session.commit.assert_awaited_once()
+    user_cache.invalidate.assert_awaited_once_with(user_id)
+    session_service.end_user_sessions.assert_awaited_once_with(user_id)
+
+
+@pytest.mark.asyncio
+async def test_block_user_tells_missing_from_already_inactive(
+    user_service, mock_db_session, session_service
+):
+    mock_db_session.execute.return_value = _one_or_none_result(None)
+
+    mock_db_session.scalar.return_value = None
+    with pytest.raises(ValueError, match="not found"):
+        await user_service.block_user(uuid4())
+
+    mock_db_session.scalar.return_value = uuid4()
+    with pytest.raises(ValueError, match="already inactive"):
+        await user_service.block_user(uuid4())
+
+    mock_db_session.commit.assert_not_awaited()
+    session_service.end_user_sessions.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_block_user_survives_session_store_errors(
+    user_service, mock_db_session, session_service
+):
+    user_id = uuid4()
+    mock_db_session.execute.return_value = _one_or_none_result(
+        _user_row(user_id, status=UserStatus.INACTIVE)
+    )
+    session_service.end_user_sessions.side_effect = ConnectionError()
+
+    user = await user_service.block_user(user_id)
+
+    assert user.status == UserStatus.INACTIVE
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_unblock_user_is_a_guarded_update(
+    user_service, mock_db_session, session_service
+):
+    user_id = uuid4()
+    mock_db_session.execute.return_value = _one_or_none_result(
+        _user_row(user_id, status=UserStatus.ACTIVE)
+    )
+
+    user = await user_service.unblock_user(user_id)
+
+    assert user.status == UserStatus.ACTIVE
+    assert "users.status != " in _sql(mock_db_session)
+    session_service.end_user_sessions.assert_not_awaited()
+
+    mock_db_session.execute.return_value = _one_or_none_result(None)
+    mock_db_session.scalar.return_value = user_id
+    with pytest.raises(ValueError, match="already active"):
+        await user_service.unblock_user(user_id)
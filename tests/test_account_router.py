@@ -171,6 +171,11 @@ def manage_stubs(monkeypatch):
     StubUserService.reset()
     # Apply the stub UserService globally for the test
     monkeypatch.setattr(account_router, "UserService", StubUserService)
+    monkeypatch.setitem(
+        app.dependency_overrides,
+        dependencies.get_user_service,
+        lambda: StubUserService(None, __import__("logging").getLogger("test")),
+    )
     # Ensure default CSRF and Auth overrides are in place (can be overridden per-test)
     monkeypatch.setitem(
         app.dependency_overrides,
@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from utils.cache_utils import TTLCache
+
+
+def test_get_returns_stored_value():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+
+
+def test_evicts_least_recently_used_when_full():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=2, ttl=30)
+    with patch("utils.cache_utils.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("utils.cache_utils.time.monotonic", return_value=129.0):
+        assert cache.get("a") == 1
+    with patch("utils.cache_utils.time.monotonic", return_value=131.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_override_is_capped_and_non_positive_skips():
+    cache = TTLCache(maxsize=2, ttl=10)
+    with patch("utils.cache_utils.time.monotonic", return_value=0.0):
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=0)
+    with patch("utils.cache_utils.time.monotonic", return_value=11.0):
+        assert cache.get("a") is None
+    assert cache.get("b") is None
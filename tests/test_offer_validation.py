@@ -527,6 +527,12 @@ def test_offer_image_size_validation(size_kb, expected_code):
             status.HTTP_400_BAD_REQUEST,
             "INVALID_PRICE",
         ),  # Price exceeds limit
+        (
+            "9.999",
+            "1",
+            status.HTTP_400_BAD_REQUEST,
+            "INVALID_PRICE",
+        ),  # More than two decimal places
     ],
 )
 def test_offer_numeric_field_validation(
@@ -0,0 +1,16 @@
+from utils.password_utils import get_password_hash, verify_password
+
+
+def test_hash_verifies_only_the_original_password():
+    hashed = get_password_hash("Password10!", rounds=4)
+
+    assert hashed.startswith("$2b$04$")
+    assert verify_password("Password10!", hashed)
+    assert not verify_password("Password11!", hashed)
+
+
+def test_verifies_hashes_created_by_passlib():
+    hashed = "$2b$04$oH7Xbn5D/Pv5U24jcLJCYOXW7cfpgAdVvUsji6I85n8n7XcPzPE9u"
+
+    assert verify_password("Password10!", hashed)
+    assert not verify_password("Password11!", hashed)
@@ -0,0 +1,75 @@
+import asyncio
+from unittest.mock import patch
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI, Response
+from starlette.testclient import TestClient
+
+import dependencies
+from dependencies import get_current_user_optional, require_authenticated
+from services.session_service import SessionService
+
+session_service = SessionService(cookie_name="test_session")
+
+app = FastAPI()
+
+
+@app.get("/me")
+async def me(user_data: dict = Depends(require_authenticated)):
+    return user_data
+
+
+@app.get("/both")
+async def both(
+    user_data: dict = Depends(require_authenticated),
+    optional_user: dict = Depends(get_current_user_optional),
+):
+    return optional_user
+
+
+@app.get("/public")
+async def public():
+    return {}
+
+
+client = TestClient(app)
+
+
+def _login(user_id, role):
+    response = Response()
+    asyncio.run(session_service.create_session(response, user_id, role))
+    return response.headers["set-cookie"].split(";")[0].split("=", 1)[1]
+
+
+def test_resolves_session_cookie():
+    user_id = uuid4()
+    token = _login(user_id, "Seller")
+
+    with patch.object(dependencies, "session_service", session_service):
+        result = client.get("/me", cookies={"test_session": token})
+
+    assert result.status_code == 200
+    assert result.json() == {"user_id": str(user_id), "user_role": "Seller"}
+
+
+def test_rejects_missing_and_invalid_cookies():
+    with patch.object(dependencies, "session_service", session_service):
+        assert client.get("/me").status_code == 401
+        assert (
+            client.get("/me", cookies={"test_session": "garbage"}).status_code
+            == 401
+        )
+
+
+def test_session_is_resolved_once_per_request_and_only_when_needed():
+    token = _login(uuid4(), "Buyer")
+
+    with patch.object(dependencies, "session_service", session_service):
+        with patch.object(
+            session_service, "peek_session", wraps=session_service.peek_session
+        ) as peek_session:
+            client.get("/both", cookies={"test_session": token})
+            assert peek_session.call_count == 1
+
+            client.get("/public", cookies={"test_session": token})
+            assert peek_session.call_count == 1
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from schemas import UserDTO, UserRole, UserStatus
+from utils.user_cache import UserCache
+
+
+def _user() -> UserDTO:
+    return UserDTO(
+        id=uuid4(),
+        email="user@example.com",
+        role=UserRole.BUYER,
+        status=UserStatus.ACTIVE,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_local_cache_set_get_and_invalidate():
+    cache = UserCache(ttl=60)
+    user = _user()
+
+    async def scenario():
+        assert await cache.get(user.id) is None
+        await cache.set(user)
+        assert await cache.get(user.id) == user
+        await cache.invalidate(user.id)
+        assert await cache.get(user.id) is None
+
+    asyncio.run(scenario())
+
+
+def test_redis_cache_round_trips_json_with_ttl():
+    redis_client = AsyncMock()
+    cache = UserCache(redis_client, ttl=30)
+    user = _user()
+
+    async def scenario():
+        await cache.set(user)
+        key, raw = redis_client.set.call_args.args
+        assert key == f"user:{user.id}"
+        assert redis_client.set.call_args.kwargs == {"ex": 30}
+
+        redis_client.get.return_value = raw
+        assert await cache.get(user.id) == user
+
+        await cache.invalidate(user.id)
+        redis_client.delete.assert_awaited_once_with(key)
+
+    asyncio.run(scenario())
+
+
+def test_redis_errors_are_treated_as_misses():
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = ConnectionError("redis down")
+    cache = UserCache(redis_client)
+
+    assert asyncio.run(cache.get(uuid4())) is None